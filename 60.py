@@ -144,9 +144,6 @@ def FOUR_ANS(guess):
                 return sum(arr), arr
     return -1, ()
 
-def PROFILE():
-    import cProfile
-    cProfile.run('ANSWER(10000)')
 
 def ANSWER(guess):
     primes = list(euler.utils.numtheory.bounded_soe(guess))
@@ -0,0 +1,13 @@
+""" Benchmarks problem solutions; see utils/bench.py for the details.
+
+    python bench.py p50 p87 --repeat 5 --json results.json
+    python -m euler.bench p50 p87
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import utils.bench
+
+if __name__ == '__main__':
+    sys.exit(utils.bench.main())
@@ -18,8 +18,7 @@ strongly advised that you solve this one first.
 """
 
 from __future__ import print_function
-from euler.utils.numtheory import factorize
-from itertools import count
+from euler.utils.numtheory import factorize, multiplicative_range
 
 
 def count_solutions(n):
@@ -45,9 +44,9 @@ def count_solutions(n):
     so d(M^2) = prod(2*ei + 1, i in range(1, k))
     """
     ans = 1
-    for e in factorize(n).itervalues():
+    for e in factorize(n).values():
         ans *= (2*e + 1)
-    ans = (ans+1)/2
+    ans = (ans+1)//2
     return ans
 
 
@@ -55,15 +54,23 @@ def min_n_with_at_least_N_solutions(N):
     """ Gives the lowest n which has at least N distinct pairs (x,y) solving
         1/x + 1/y = 1/n   (x < y)
 
+    Rather than factorizing each n, tabulates d(n^2) (see count_solutions)
+    for a whole block of n at once, quadrupling the block until the answer
+    falls inside it.
+
     For debugging, prints each n which has more divisors than all m<n. """
     n_max, s_max = 0, 0
-    for n in count(4):
-        solutions = count_solutions(n)
-        if solutions > s_max:
-            n_max, s_max = n, solutions
-            print('count_solutions({!s}) = {!s}'.format(n_max, s_max))
-        if solutions > N:
-            return n
+    lo, hi = 4, 1024
+    while True:
+        divisors_of_square = multiplicative_range(hi, lambda p, e: 2*e + 1)
+        for n in range(lo, hi+1):
+            solutions = (divisors_of_square[n] + 1) // 2
+            if solutions > s_max:
+                n_max, s_max = n, solutions
+                print('count_solutions({!s}) = {!s}'.format(n_max, s_max))
+            if solutions > N:
+                return n
+        lo, hi = hi+1, 4*hi
 
 
 if __name__ == '__main__':
@@ -102,9 +102,6 @@ def TEST():
     suite = unittest.TestLoader().loadTestsFromTestCase(_TEST)
     unittest.TextTestRunner(verbosity=2).run(suite)
 
-def PROFILE():
-    import cProfile
-    cProfile.run('ANSWER()')
 
 def ANSWER():
     seq = longest_consecutive_prime_sum_less_than(1000000)
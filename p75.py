@@ -194,9 +194,6 @@ def TIMEIT():
     print(timeit.timeit('unique_pythagorean_perimeters(1000000)', number=1,
           setup='from __main__ import unique_pythagorean_perimeters'))
 
-def PROFILE():
-    import cProfile
-    cProfile.run('unique_pythagorean_perimeters(100000)')
 
 def TEST():
     unittest.main(verbosity=2, exit=False)
@@ -18,50 +18,35 @@ Find the minimal path sum in the 80 by 80 matrix, from the top left to the
 bottom right by only moving right and down."""
 
 import utils.graph
+import utils.grid
+import utils.io
 
 def load_file(filename):
     """ Takes filename of line separated rows of comma-separated entries.
 
-    Returns a tuple (graph, start, end) with:
-        - graph: a digraph with edges encoding the rules of only moving down
-                 and to the right, and nodes created from the csv values.
-        - start: the top-left-most value
-        - end:   the bottom-right-most value.
+    Returns a tuple (graph, sources, targets) with:
+        - graph:   a digraph with edges encoding the rules of only moving down
+                   and to the right, and nodes created from the csv values.
+        - sources: the top-left-most node, mapped to its value (the cost of
+                   starting there)
+        - targets: the bottom-right-most node.
     """
-    # Create matrix from csv lines
-    with open(filename) as f:
-        m = [list(map(int, line.split(','))) for line in f]
-    # Create digraph from matrix
-    graph = utils.graph.DiGraph()
-    ROWS = len(m)
-    COLS = len(m[0])
-    for r in range(ROWS):
-        for c in range(COLS):
-            u = (r, c)
-            if c+1 < COLS:
-                v = (r, c+1)
-                weight = m[r][c+1]
-                graph.add_edge(u, v, weight)
-            if r+1 < ROWS:
-                v = (r+1, c)
-                weight = m[r+1][c]
-                graph.add_edge(u, v, weight)
-    # also add a start element and create an edge to first val
-    graph.add_edge('START', (0,0), m[0][0])
-    return graph, 'START', (ROWS-1, COLS-1)
+    m = utils.io.load_int_matrix(filename)
+    graph = utils.graph.DiGraph.from_edges(
+        utils.grid.cell_edges(m, utils.grid.RIGHT_DOWN), weights=True)
+    ROWS, COLS = m.rows, m.cols
+    return graph, {(0, 0): m[0][0]}, [(ROWS-1, COLS-1)]
 
 def ANSWER():
-    graph, start, end = load_file('matrix.txt')
-    print('Start:', start, 'End:', end)
-    path = utils.graph.dijkstra(graph, start, end)
-    path_cost = utils.graph.path_cost(graph, path)
-    return path_cost
+    rows = utils.io.iter_int_rows('matrix.txt')
+    return utils.grid.min_path_sum(rows, moves=utils.grid.RIGHT_DOWN)
 
 def TEST():
     expect = [131, 201, 96, 342, 746, 422, 121, 37, 331]
-    graph, start, end = load_file('matrix_test.txt')
-    actual = utils.graph.dijkstra(graph, start, end)
-    actual_cost = utils.graph.path_cost(graph, actual)
+    graph, sources, targets = load_file('matrix_test.txt')
+    actual_cost, end, _, pred = utils.graph.shortest_distance(
+        graph, sources, targets, return_maps=True)
+    actual = utils.graph.path_to(pred, end)
     print('ACTUAL:', actual, '=', actual_cost)
     print('EXPECT:', expect, '=', sum(expect))
 
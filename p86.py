@@ -171,7 +171,3 @@ if __name__ == '__main__':
     print('-'*20)
     print('ANS')
     print(ANS(20))
-
-def PROFILE():
-    import cProfile
-    cProfile.run('min_M(1000000)')
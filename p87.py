@@ -56,11 +56,7 @@ def sums_below(N):
                     break
     return len(calculated_vals)
 
-def PROFILE():
-    import cProfile
-    cProfile.run('sums_below(5e7)')
 
 if __name__ == '__main__':
     import utils
-    #PROFILE()
     utils.solution_printer(sums_below, (5e7,))
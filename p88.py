@@ -71,13 +71,13 @@ def min_product_sum_numbers(kmin, kmax):
     return N_mins
 
 def sum_of_minimal_product_sum_numbers(kmin, kmax):
-    d = min_product_sum_numbers(kmin, kmax)
+    # The minimal product-sum number for k is at most 2k (k-2 ones, 2 and k),
+    # so every N visited can be factorized from a single table.
+    with utils.numtheory.FactorTable(2*kmax):
+        d = min_product_sum_numbers(kmin, kmax)
     vals = [v[0] for v in d.values()]
     return sum(set(vals))
 
-def PROFILE():
-    import cProfile
-    cProfile.run('sum_of_minimal_product_sum_numbers(2, 5000)')
 
 if __name__ == '__main__':
     import utils
@@ -0,0 +1,13 @@
+""" Runs every problem solution in parallel; see utils/runall.py.
+
+    python runall.py --workers 8 --timeout 60
+    python -m euler.runall
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import utils.runall
+
+if __name__ == '__main__':
+    sys.exit(utils.runall.main())
@@ -1,10 +1,19 @@
 from __future__ import print_function
+import collections
 import functools
 import fractions
 
-def solution_printer(ans_func, args=(), kwargs={}):
+def solution_printer(ans_func, args=(), kwargs={}, profile=None):
+    """ Prints the problem statement (the docstring of ans_func's module), then
+    runs ans_func(*args, **kwargs) and prints the answer and running time.
+
+    If profile is given, or the script was run with --profile=MODE, the call
+    runs under that profiler (cprofile, tracemalloc or sampling; see
+    utils.profiling), with output files named after the problem module. """
     import importlib
+    import os
     from datetime import datetime
+    import utils.profiling
     # Print problem statement in module docstring
     mod_name = ans_func.__module__
     ans_mod = importlib.import_module(mod_name)
@@ -12,27 +21,179 @@ def solution_printer(ans_func, args=(), kwargs={}):
     print('-'*80)
     print(ans_doc)
     print('-'*80)
+    profile = profile or utils.profiling.mode_from_argv()
     # Start timer
     start = datetime.now()
     # Get and print answer
-    answer = ans_func(*args, **kwargs)
+    if profile:
+        prefix = os.path.splitext(os.path.basename(ans_mod.__file__))[0]
+        answer = utils.profiling.profile_call(ans_func, args, kwargs,
+                                              profile, prefix)
+    else:
+        answer = ans_func(*args, **kwargs)
     print('Answer:', answer)
     # Print running time
     end = datetime.now()
     print('Running time:', end-start)
 
 
-def memoize(obj):
+CacheInfo = collections.namedtuple('CacheInfo',
+                                   'hits misses evictions maxsize currsize')
+
+
+class _LRUCache(object):
+    """ Mapping which, once full, evicts the least recently used key. """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value):
+        """ Stores value under key. Returns True if a key was evicted. """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            return True
+        return False
+
+    def clear(self):
+        self._data.clear()
+
+
+class _LFUCache(object):
+    """ Mapping which, once full, evicts the least frequently used key (the
+    least recently used among ties). All operations are O(1). """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = {} # key -> [value, frequency]
+        self._buckets = collections.defaultdict(collections.OrderedDict)
+        self._min_freq = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def _touch(self, key):
+        entry = self._data[key]
+        freq = entry[1]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        entry[1] = freq + 1
+        self._buckets[freq+1][key] = None
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._touch(key)
+        return self._data[key][0]
+
+    def put(self, key, value):
+        """ Stores value under key. Returns True if a key was evicted. """
+        if key in self._data:
+            self._data[key][0] = value
+            self._touch(key)
+            return False
+        evicted = False
+        if self.maxsize is not None and len(self._data) >= self.maxsize:
+            bucket = self._buckets[self._min_freq]
+            old_key, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self._buckets[self._min_freq]
+            del self._data[old_key]
+            evicted = True
+        self._data[key] = [value, 1]
+        self._buckets[1][key] = None
+        self._min_freq = 1
+        return evicted
+
+    def clear(self):
+        self._data.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+
+_CACHE_POLICIES = {'lru': _LRUCache, 'lfu': _LFUCache}
+
+# Separates positional from keyword arguments in memoize's cache keys
+_KWARGS_MARK = object()
+
+def memoize(obj=None, maxsize=None, policy='lru'):
     """ Memoizing decorator that works on functions, methods, or classes, and
     exposes cache publically.
 
+    Can be used bare, in which case the cache is unbounded:
+    >>> @memoize
+    ... def square(x): return x*x
+
+    or with a maximum size and an eviction policy, 'lru' (least recently
+    used) or 'lfu' (least frequently used):
+    >>> @memoize(maxsize=2, policy='lfu')
+    ... def cube(x): return x*x*x
+    >>> [cube(2), cube(2), cube(3), cube(4)]
+    [8, 8, 27, 64]
+    >>> cube.cache_info()
+    CacheInfo(hits=1, misses=3, evictions=1, maxsize=2, currsize=2)
+    >>> (2,) in cube.cache, (3,) in cube.cache
+    (True, False)
+
+    maxsize is None (unbounded) or at least 1. Keyword arguments are part
+    of the cache key. The decorated function has
+    cache_info() and cache_clear() methods, like functools.lru_cache.
+
     See: http://wiki.python.org/moin/PythonDecoratorLibrary#Memoize"""
-    cache = obj.cache = {}
+    if policy not in _CACHE_POLICIES:
+        raise ValueError('Unknown cache policy %r' % policy)
+    if maxsize is not None and maxsize < 1:
+        raise ValueError('maxsize must be None or at least 1, not %r'
+                         % maxsize)
+    if obj is None:
+        return functools.partial(memoize, maxsize=maxsize, policy=policy)
+    cache = obj.cache = _CACHE_POLICIES[policy](maxsize)
+    stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    missing = object()
     @functools.wraps(obj)
     def memoizer(*args, **kwargs):
-        if args not in cache:
-            cache[args] = obj(*args, **kwargs)
-        return cache[args]
+        key = args
+        if kwargs:
+            key += (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+        value = cache.get(key, missing)
+        if value is missing:
+            stats['misses'] += 1
+            value = obj(*args, **kwargs)
+            if cache.put(key, value):
+                stats['evictions'] += 1
+        else:
+            stats['hits'] += 1
+        return value
+    def cache_info():
+        return CacheInfo(stats['hits'], stats['misses'], stats['evictions'],
+                         maxsize, len(cache))
+    def cache_clear():
+        cache.clear()
+        stats.update(hits=0, misses=0, evictions=0)
+    memoizer.cache = cache
+    memoizer.cache_info = cache_info
+    memoizer.cache_clear = cache_clear
     return memoizer
 
 def nCr(N, r):
@@ -0,0 +1,124 @@
+from euler.utils import bench
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError: # Python 2
+    import mock
+
+STUB = '''
+import utils
+
+def ANSWER(n):
+    print('working...')
+    return n * n
+
+if __name__ == '__main__':
+    utils.solution_printer(ANSWER, args=(12,))
+'''
+
+HELPER = '''
+def helper():
+    return 1
+'''
+
+
+class TestBench(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for name, source in [('pstub', STUB), ('helper', HELPER),
+                             ('bench', STUB), ('__init__', '')]:
+            with open(os.path.join(self.dir, name + '.py'), 'w') as f:
+                f.write(source)
+        self.repo_dir = bench.REPO_DIR
+        self.path = list(sys.path)
+        bench.REPO_DIR = self.dir
+
+    def tearDown(self):
+        bench.REPO_DIR = self.repo_dir
+        sys.path[:] = self.path
+        shutil.rmtree(self.dir)
+
+    def test_percentile(self):
+        values = list(range(1, 11))
+        self.assertEqual(10, bench._percentile(values, 95))
+        self.assertEqual(5, bench._percentile(values, 50))
+        self.assertEqual(1, bench._percentile(values, 1))
+        self.assertEqual(7, bench._percentile([7], 95))
+
+    def test_discover(self):
+        self.assertEqual(['pstub'], bench.discover())
+
+    def test_find_answer(self):
+        ans_func, args, kwargs = bench.find_answer('pstub')
+        self.assertEqual(((12,), {}), (args, kwargs))
+        self.assertEqual(144, ans_func(*args, **kwargs))
+
+    def test_find_answer_failures(self):
+        self.assertRaises(ValueError, bench.find_answer, 'missing')
+        self.assertRaises(ValueError, bench.find_answer, 'helper')
+
+    def test_measure(self):
+        result = bench.measure('pstub', repeat=3, warmup=0)
+        self.assertEqual('144', result['answer'])
+        self.assertEqual(3, len(result['times']))
+        self.assertEqual(sorted(result['times']), result['times'])
+        self.assertEqual(result['times'][1], result['median'])
+        self.assertEqual(result['times'][0], result['min'])
+        self.assertEqual(result['times'][2], result['p95'])
+
+    def test_median_of_even_repeats(self):
+        result = bench.measure('pstub', repeat=2, warmup=0)
+        self.assertAlmostEqual(sum(result['times']) / 2, result['median'])
+
+    def test_check_budgets(self):
+        result = {'median': 1.0, 'import_seconds': 0.1}
+        self.assertTrue(bench.check_budgets(result, 2.0, 0.5))
+        self.assertFalse(bench.check_budgets(result, 0.5, 0.5))
+        self.assertFalse(bench.check_budgets(result, 2.0, 0.05))
+        self.assertFalse(result['within_budget'])
+        self.assertFalse(bench.check_budgets({'error': 'boom'}))
+
+    def fake_run(self, name, repeat, warmup, timeout, profile, profile_dir):
+        return {'problem': name, 'answer': '144', 'times': [0.5], 'min': 0.5,
+                'median': 0.5, 'p95': 0.5, 'import_seconds': 0.01,
+                'peak_rss_bytes': None}
+
+    def test_json_and_compare(self):
+        report = os.path.join(self.dir, 'results.json')
+        out = io.StringIO()
+        with mock.patch.object(bench, 'run', self.fake_run), \
+                contextlib.redirect_stdout(out):
+            self.assertEqual(0, bench.main(['pstub', '--json', report]))
+        with open(report) as f:
+            saved = json.load(f)
+        self.assertEqual(['pstub'], [r['problem'] for r in saved['results']])
+        self.assertTrue(saved['results'][0]['within_budget'])
+        saved['results'][0]['median'] = 0.25
+        with open(report, 'w') as f:
+            json.dump(saved, f)
+        out = io.StringIO()
+        with mock.patch.object(bench, 'run', self.fake_run), \
+                contextlib.redirect_stdout(out):
+            bench.main(['pstub', '--compare', report])
+        self.assertIn('(2.00x baseline)', out.getvalue())
+
+    def test_over_budget_exits_nonzero(self):
+        with mock.patch.object(bench, 'run', self.fake_run), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(1, bench.main(['pstub', '--budget', '0.1']))
+
+    def test_repeat_must_be_positive(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertRaises(SystemExit, bench.main, ['pstub', '--repeat',
+                                                       '0'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,115 @@
+from euler.utils import numtheory
+import array
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError: # Python 2
+    import mock
+
+# numtheory imports the top-level utils package, so use the diskcache module
+# it actually consults.
+diskcache = numtheory.utils.diskcache
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        diskcache.enable(self.dir)
+
+    def tearDown(self):
+        diskcache.disable()
+        shutil.rmtree(self.dir)
+
+    def test_save_and_load(self):
+        table = array.array('I', range(100))
+        diskcache.save('test', 99, table)
+        loaded = diskcache.load('test', 99, 'I')
+        self.assertEqual(list(table), list(loaded))
+        self.assertTrue(loaded.readonly)
+
+    def test_failed_save_leaves_no_files(self):
+        class FullDisk(object):
+            def __init__(self, f):
+                self.f = f
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc_info):
+                self.f.close()
+            def write(self, data):
+                raise OSError(28, 'No space left on device')
+        table = array.array('I', range(100))
+        fdopen = os.fdopen
+        with mock.patch.object(diskcache.os, 'fdopen',
+                               lambda fd, mode: FullDisk(fdopen(fd, mode))):
+            diskcache.save('test', 99, table)
+        self.assertEqual([], os.listdir(self.dir))
+        with mock.patch.object(diskcache.os, 'replace',
+                               side_effect=OSError(28, 'No space')):
+            diskcache.save('test', 99, table)
+        self.assertEqual([], os.listdir(self.dir))
+
+    def test_missing_table(self):
+        self.assertIsNone(diskcache.load('test', 99, 'I'))
+
+    def test_cached_builds_once(self):
+        builds = []
+        def build():
+            builds.append(1)
+            return array.array('q', [1, 2, 3])
+        first = diskcache.cached('test', 3, 'q', build)
+        second = diskcache.cached('test', 3, 'q', build)
+        self.assertEqual([1, 2, 3], list(first))
+        self.assertEqual([1, 2, 3], list(second))
+        self.assertEqual(1, len(builds))
+
+    def test_disabled_cache_always_builds(self):
+        diskcache.disable()
+        diskcache.cached('test', 3, 'q', lambda: array.array('q'))
+        self.assertEqual([], os.listdir(self.dir))
+
+    def test_factor_table_round_trip(self):
+        built = numtheory.FactorTable(1000)
+        loaded = numtheory.FactorTable(1000)
+        self.assertIsInstance(loaded._spf, memoryview)
+        for n in range(1, 1001):
+            self.assertEqual(built.factorize(n), loaded.factorize(n))
+
+    def test_prime_table_grows_from_cached_table(self):
+        numtheory.PrimeTable(1000)
+        table = numtheory.PrimeTable(1000)
+        self.assertIsInstance(table._primes, memoryview)
+        table.extend(5000)
+        self.assertEqual(669, len(table))
+        self.assertIn(4999, table)
+
+    def test_totient_range_round_trip(self):
+        built = numtheory.totient_range(500)
+        loaded = numtheory.totient_range(500)
+        self.assertEqual(list(built), list(loaded))
+        self.assertTrue(built.readonly and loaded.readonly)
+
+    def test_bounded_soe_uses_cached_prime_table(self):
+        expect = numtheory.primes_in_range(1000, 9999)
+        table = numtheory._PRIME_TABLE
+        try:
+            numtheory._PRIME_TABLE = None
+            self.assertEqual(expect, list(numtheory.bounded_soe(9999, 1000)))
+            self.assertTrue(any(name.startswith('primes-')
+                                for name in os.listdir(self.dir)))
+            numtheory._PRIME_TABLE = None
+            self.assertEqual(expect, list(numtheory.bounded_soe(9999, 1000)))
+            self.assertIsInstance(numtheory._PRIME_TABLE._primes, memoryview)
+        finally:
+            numtheory._PRIME_TABLE = table
+
+    def test_clear(self):
+        diskcache.save('test', 1, array.array('I', [1]))
+        diskcache.clear()
+        self.assertEqual([], os.listdir(self.dir))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -1,6 +1,20 @@
-from euler.utils import graph
+from euler.utils import graph, grid
+import random
 import unittest
 
+# Dijkstra's classic six node example, plus a node 7 that nothing reaches.
+EXAMPLE_EDGES = [(1, 2, 7), (1, 3, 9), (1, 6, 14), (2, 3, 10), (2, 4, 15),
+                 (3, 4, 11), (3, 6, 2), (4, 5, 6), (6, 5, 9), (7, 1, 1)]
+
+
+def random_grid(n, low, high, seed, moves=grid.ALL_FOUR, cls=graph.DiGraph):
+    """ An n by n graph of (row, col) cells under moves, each edge weighted
+    by the random weight, from low to high, of the cell it enters. """
+    rand = random.Random(seed)
+    m = [[rand.randint(low, high) for _ in range(n)] for _ in range(n)]
+    return cls.from_edges(grid.cell_edges(m, moves), weights=True)
+
+
 class TestGraph(unittest.TestCase):
 
     def setUp(self):
@@ -135,6 +149,106 @@ class TestDiGraph(unittest.TestCase):
         self.assertEqual([2], self.g.neighbors(1))
 
 
+class TestBulkConstructors(unittest.TestCase):
+
+    EDGES = [(1, 2, 5), (2, 3, 7), (3, 1, 2), (4, 3, 1)]
+
+    def build_one_by_one(self, cls):
+        g = cls()
+        for u, v, w in self.EDGES:
+            g.add_edge(u, v, w)
+        return g
+
+    def assertSameGraph(self, expect, actual):
+        self.assertEqual(sorted(expect), sorted(actual))
+        for node in expect:
+            self.assertEqual(expect[node], actual[node])
+
+    def test_digraph_from_edges(self):
+        g = graph.DiGraph.from_edges(self.EDGES, weights=True)
+        expect = self.build_one_by_one(graph.DiGraph)
+        self.assertSameGraph(expect, g)
+        self.assertEqual(expect._pred, g._pred)
+        self.assertEqual({2: 7, 4: 1}, g._pred[3])
+
+    def test_graph_from_edges(self):
+        g = graph.Graph.from_edges(self.EDGES, weights=True)
+        self.assertSameGraph(self.build_one_by_one(graph.Graph), g)
+
+    def test_from_unweighted_edges(self):
+        g = graph.DiGraph.from_edges([('a', 'b'), ('b', 'c')])
+        self.assertEqual({'b': None}, g['a'])
+        self.assertEqual(3, len(g))
+
+    def test_from_adjacency(self):
+        adjacency = {1: {2: 5}, 2: {3: 7}, 3: [1], 5: {}}
+        g = graph.DiGraph.from_adjacency(adjacency)
+        self.assertEqual([1, 2, 3, 5], sorted(g))
+        self.assertEqual({1: None}, g[3])
+        self.assertEqual({3: 7}, g[2])
+        self.assertEqual({1: 5}, g._pred[2])
+        u = graph.Graph.from_adjacency(adjacency)
+        self.assertEqual({1: 5, 3: 7}, u[2])
+
+    def test_built_graphs_grow_normally(self):
+        g = graph.DiGraph.from_edges(self.EDGES, weights=True)
+        g.add_edge(4, 5, 1)
+        self.assertIn(5, g)
+        self.assertRaises(Exception, g.add_node, 1)
+
+    def test_slots(self):
+        for g in [graph.Graph(), graph.DiGraph(),
+                  graph.CSRGraph.from_graph(graph.DiGraph())]:
+            self.assertFalse(hasattr(g, '__dict__'))
+
+
+class TestViews(unittest.TestCase):
+
+    def test_undirected_edges_once(self):
+        g = graph.Graph()
+        for u, v in [(1, 2), (2, 3), (3, 1), (3, 3), (2, 1)]:
+            g.add_edge(u, v, u + v)
+        edges = g.edge_view()
+        self.assertEqual(4, len(edges))
+        self.assertEqual(4, len(list(edges)))
+        self.assertEqual(set([frozenset(e) for e in [(1, 2), (2, 3), (1, 3),
+                                                     (3, 3)]]),
+                         set(frozenset(e) for e in edges))
+        self.assertIn((2, 1), edges)
+        self.assertNotIn((1, 4), edges)
+
+    def test_views_are_live(self):
+        g = graph.DiGraph()
+        edges, adj = g.edge_view(weights=True), g.adj
+        g.add_edge('a', 'b', 1)
+        g.add_edge('b', 'a', 2)
+        self.assertEqual(2, len(edges))
+        self.assertEqual(sorted([('a', 'b', 1), ('b', 'a', 2)]),
+                         sorted(edges))
+        neighbors = adj['a']
+        g.add_edge('a', 'c', 3)
+        self.assertEqual({'b': 1, 'c': 3}, dict(neighbors))
+        self.assertEqual(3, g.num_edges)
+
+    def test_adjacency_is_read_only(self):
+        g = graph.Graph()
+        g.add_edge(1, 2, 5)
+        self.assertEqual(5, g.adj[1][2])
+        self.assertEqual([1, 2], sorted(g.adj))
+        def mutate():
+            g.adj[1][3] = 1
+        self.assertRaises(TypeError, mutate)
+
+    def test_counts_after_bulk_build(self):
+        g = graph.Graph.from_edges([(1, 2), (2, 1), (2, 2), (2, 3)])
+        self.assertEqual(3, len(g.edge_view()))
+        self.assertEqual(3, len(list(g.edges())))
+        d = graph.DiGraph.from_edges([(1, 2), (2, 1), (2, 2), (2, 3)])
+        self.assertEqual(4, len(d.edge_view()))
+        d.add_edge(1, 2)
+        self.assertEqual(4, len(d.edge_view()))
+
+
 class TestAlgorithmsDigraph(unittest.TestCase):
 
     def create_digraph(self):
@@ -162,6 +276,292 @@ class TestAlgorithmsDigraph(unittest.TestCase):
         g = self.create_digraph()
         actual = graph.dijkstra(g, 131, 331)
         self.assertEqual(expect, actual)
+
+    def test_dijkstra_csr(self):
+        expect = [131, 201, 96, 342, 746, 422, 121, 37, 331]
+        g = graph.CSRGraph.from_graph(self.create_digraph())
+        actual = graph.dijkstra(g, 131, 331)
+        self.assertEqual(expect, actual)
+
+    def test_shortest_distance(self):
+        g = self.create_digraph()
+        self.assertEqual(2427 - 131, graph.shortest_distance(g, [131], [331]))
+        self.assertEqual(2427, graph.shortest_distance(g, {131: 131}, [331]))
+
+    def test_shortest_distance_many_sources_and_targets(self):
+        g = self.create_digraph()
+        # From anywhere in the first column to anywhere in the last
+        sources = dict((w, w) for w in [131, 201, 630, 537, 805])
+        targets = [18, 150, 111, 956, 331]
+        distance, target, dist, pred = graph.shortest_distance(
+            g, sources, targets, return_maps=True)
+        self.assertEqual(131 + 673 + 234 + 103 + 18, distance)
+        self.assertEqual(18, target)
+        self.assertEqual([131, 673, 234, 103, 18], graph.path_to(pred, 18))
+        self.assertEqual(distance, dist[18])
+        self.assertNotIn(331, dist) # Stopped at the first target
+
+    def test_shortest_distance_csr(self):
+        g = self.create_digraph()
+        csr = graph.CSRGraph.from_graph(g)
+        sources = {131: 131, 201: 201}
+        self.assertEqual(graph.shortest_distance(g, sources, [111, 331]),
+                         graph.shortest_distance(csr, sources, [111, 331]))
+
+    def test_shortest_distance_unreachable(self):
+        g = self.create_digraph()
+        self.assertRaises(Exception, graph.shortest_distance, g, [331], [131])
+
+    def test_shortest_path_tree(self):
+        g = self.create_digraph()
+        dist, pred = graph.shortest_path_tree(g, [131])
+        self.assertEqual(25, len(dist))
+        self.assertEqual(2427 - 131, dist[331])
+        self.assertEqual(graph.dijkstra(g, 131, 331), graph.path_to(pred, 331))
+        csr_dist, csr_pred = graph.shortest_path_tree(
+            graph.CSRGraph.from_graph(g), [131])
+        self.assertEqual(dist, csr_dist)
+
+    def test_dijkstra_mixed_node_types(self):
+        g = graph.DiGraph()
+        g.add_edge('START', (0, 0), 1)
+        g.add_edge('START', (0, 1), 1)
+        g.add_edge((0, 0), 'END', 1)
+        g.add_edge((0, 1), 'END', 1)
+        self.assertEqual(3, len(graph.dijkstra(g, 'START', 'END')))
+        self.assertEqual(3, len(graph.astar(g, 'START', 'END')))
+
+    def test_astar_matches_dijkstra(self):
+        g = self.create_digraph()
+        stats = {}
+        self.assertEqual(graph.dijkstra(g, 131, 331),
+                         graph.astar(g, 131, 331, stats=stats))
+        self.assertEqual(2427 - 131, stats['distance'])
+
+
+class TestAStarGrid(unittest.TestCase):
+
+    def create_grid(self):
+        # Cell weights of 5 or 6, so manhattan_heuristic(5) is admissible
+        return random_grid(30, 5, 6, seed=83)
+
+    def test_astar_expands_fewer_nodes(self):
+        g = self.create_grid()
+        goal = (29, 29)
+        distance, _, dist, _ = graph.shortest_distance(
+            g, [(0, 0)], [goal], return_maps=True)
+        stats = {}
+        path = graph.astar(g, (0, 0), goal, graph.manhattan_heuristic(5),
+                           stats)
+        self.assertEqual(distance, stats['distance'])
+        self.assertEqual(distance, graph.path_cost(g, path))
+        self.assertLess(stats['expanded'], len(dist))
+
+    def test_bidirectional_dijkstra(self):
+        g = self.create_grid()
+        for goal in [(29, 29), (0, 29), (15, 3), (0, 1)]:
+            distance, _, dist, _ = graph.shortest_distance(
+                g, [(0, 0)], [goal], return_maps=True)
+            stats = {}
+            path = graph.bidirectional_dijkstra(g, (0, 0), goal, stats)
+            self.assertEqual(((0, 0), goal), (path[0], path[-1]))
+            self.assertEqual(distance, graph.path_cost(g, path))
+            self.assertEqual(distance, stats['distance'])
+            self.assertLessEqual(stats['expanded'], len(dist) + 1)
+
+    def test_bidirectional_dijkstra_expands_fewer_nodes(self):
+        g = self.create_grid()
+        start, goal = (10, 10), (20, 20)
+        _, _, dist, _ = graph.shortest_distance(g, [start], [goal],
+                                                return_maps=True)
+        stats = {}
+        graph.bidirectional_dijkstra(g, start, goal, stats)
+        self.assertLess(stats['expanded'], 0.75 * len(dist))
+
+    def test_bidirectional_dijkstra_undirected(self):
+        g = graph.Graph.from_edges(EXAMPLE_EDGES, weights=True)
+        self.assertEqual([1, 3, 6, 5], graph.bidirectional_dijkstra(g, 1, 5))
+        self.assertEqual([5, 6, 3, 1], graph.bidirectional_dijkstra(g, 5, 1))
+        self.assertEqual([4], graph.bidirectional_dijkstra(g, 4, 4))
+
+    def test_bidirectional_dijkstra_unreachable(self):
+        g = graph.DiGraph()
+        g.add_edge((0, 0), (0, 1), 1)
+        self.assertRaises(Exception, graph.bidirectional_dijkstra, g,
+                          (0, 1), (0, 0))
+
+    def test_astar_unreachable(self):
+        g = graph.DiGraph()
+        g.add_edge((0, 0), (0, 1), 1)
+        self.assertRaises(Exception, graph.astar, g, (0, 1), (0, 0),
+                          graph.manhattan_heuristic())
+
+
+class TestShortestPathIndex(unittest.TestCase):
+
+    def create_graph(self):
+        return graph.DiGraph.from_edges(EXAMPLE_EDGES, weights=True)
+
+    def test_queries(self):
+        g = self.create_graph()
+        index = graph.ShortestPathIndex(g, 1)
+        for goal in [1, 2, 3, 4, 5, 6]:
+            self.assertEqual(graph.shortest_distance(g, [1], [goal]),
+                             index.distance(goal))
+            self.assertEqual(graph.dijkstra(g, 1, goal), index.path(goal))
+        self.assertNotIn(7, index)
+        self.assertRaises(Exception, index.distance, 7)
+        self.assertRaises(Exception, index.path, 7)
+
+    def test_csr(self):
+        g = self.create_graph()
+        index = graph.ShortestPathIndex(graph.CSRGraph.from_graph(g), 1)
+        self.assertEqual(graph.ShortestPathIndex(g, 1).dist, index.dist)
+
+    def test_build_many(self):
+        g = self.create_graph()
+        serial = graph.ShortestPathIndex.build_many(g, g, workers=1)
+        pooled = graph.ShortestPathIndex.build_many(g, g, workers=2)
+        self.assertEqual(sorted(g), sorted(pooled))
+        for source in g:
+            self.assertEqual(serial[source].dist, pooled[source].dist)
+            self.assertEqual(serial[source].pred, pooled[source].pred)
+
+
+class TestDynamicShortestPaths(unittest.TestCase):
+
+    def create_grid(self, cls, n=15):
+        # An undirected Graph needs each edge only once
+        moves = grid.ALL_FOUR if cls is graph.DiGraph else grid.RIGHT_DOWN
+        return random_grid(n, 1, 99, seed=23, moves=moves, cls=cls)
+
+    def check_against_recomputation(self, cls):
+        g = self.create_grid(cls)
+        rand = random.Random(23)
+        paths = graph.DynamicShortestPaths(g, (0, 0))
+        edges = [(u, v) for u in g for v in g[u]]
+        for _ in range(200):
+            u, v = rand.choice(edges)
+            paths.update_weight(u, v, rand.randint(1, 99))
+            dist, _ = graph.shortest_path_tree(g, [(0, 0)])
+            self.assertEqual(dist, paths.dist)
+        for node in g:
+            self.assertEqual(paths.distance(node),
+                             graph.path_cost(g, paths.path(node)))
+
+    def test_digraph(self):
+        self.check_against_recomputation(graph.DiGraph)
+
+    def test_undirected_graph(self):
+        self.check_against_recomputation(graph.Graph)
+
+    def test_small_edits_repair_little(self):
+        g = self.create_grid(graph.DiGraph, 30)
+        paths = graph.DynamicShortestPaths(g, (0, 0))
+        # An edge far from the source: it moves at most a few distances
+        corner = (29, 29)
+        parent = paths.pred[corner]
+        self.assertLess(paths.update_weight(parent, corner, 1000), 10)
+        self.assertLess(paths.update_weight(parent, corner, 1), 10)
+
+    def test_unreachable_nodes(self):
+        g = graph.DiGraph()
+        g.add_edge('a', 'b', 1)
+        g.add_edge('c', 'b', 1)
+        g.add_edge('b', 'd', 1)
+        paths = graph.DynamicShortestPaths(g, 'c')
+        self.assertNotIn('a', paths)
+        paths.update_weight('a', 'b', 0)
+        self.assertEqual(['c', 'b', 'd'], paths.path('d'))
+
+    def test_missing_edge(self):
+        g = graph.DiGraph()
+        g.add_edge('a', 'b', 1)
+        paths = graph.DynamicShortestPaths(g, 'a')
+        for u, v in [('b', 'a'), ('x', 'a'), ('a', 'x')]:
+            with self.assertRaises(Exception) as raised:
+                paths.update_weight(u, v, 1)
+            self.assertNotIsInstance(raised.exception, KeyError)
+            self.assertIn('No edge', str(raised.exception))
+        self.assertEqual({'a': 0, 'b': 1}, paths.dist)
+
+    def test_update_weight_needs_an_edge(self):
+        g = graph.DiGraph()
+        g.add_edge(1, 2, 5)
+        g.update_weight(1, 2, 3)
+        self.assertEqual({2: 3}, g[1])
+        self.assertRaises(Exception, g.update_weight, 2, 1, 3)
+        u = graph.Graph()
+        u.add_edge(1, 2, 5)
+        u.update_weight(2, 1, 3)
+        self.assertEqual(3, u[1][2])
+
+
+class TestMultiSourceParallel(unittest.TestCase):
+
+    def create_grid(self, n=12):
+        # Up, down and right, as in p82
+        return graph.CSRGraph.from_graph(
+            random_grid(n, 1, 99, seed=22, moves=grid.UP_DOWN_RIGHT))
+
+    def check(self, csr, sources, result):
+        self.assertEqual(sorted(sources), sorted(result))
+        for source in sources:
+            dist, _ = graph.shortest_path_tree(csr, [source])
+            expect = [dist.get(node, graph.UNREACHABLE) for node in csr]
+            self.assertEqual(expect, list(result[source]))
+
+    def test_left_edge_in_processes(self):
+        csr = self.create_grid()
+        sources = [(r, 0) for r in range(12)]
+        result = graph.multi_source_dijkstra_parallel(csr, sources, workers=2)
+        self.check(csr, sources, result)
+
+    def test_in_process(self):
+        csr = self.create_grid(5)
+        sources = list(csr)
+        result = graph.multi_source_dijkstra_parallel(csr, sources, workers=1)
+        self.check(csr, sources, result)
+
+    def test_unreachable(self):
+        csr = self.create_grid(4)
+        result = graph.multi_source_dijkstra_parallel(csr, [(0, 3), (3, 3)],
+                                                      workers=2)
+        # Nothing moves left
+        self.assertEqual(graph.UNREACHABLE, result[(0, 3)][csr.index[(0, 0)]])
+        self.assertEqual(0, result[(3, 3)][csr.index[(3, 3)]])
+
+
+class TestCSRGraph(unittest.TestCase):
+
+    def test_from_digraph(self):
+        g = graph.DiGraph()
+        g.add_edge(1, 2, 5)
+        g.add_edge(1, 3, 7)
+        g.add_edge(3, 2, 1)
+        csr = graph.CSRGraph.from_graph(g)
+        self.assertEqual(3, len(csr))
+        self.assertEqual(3, csr.num_edges)
+        self.assertEqual({2: 5, 3: 7}, csr[1])
+        self.assertEqual({}, csr[2])
+        self.assertEqual([2], csr.neighbors(3))
+        self.assertEqual([1, 2], graph.dijkstra(csr, 1, 2))
+
+    def test_from_undirected_graph(self):
+        g = graph.Graph()
+        g.add_edge('a', 'b', 2)
+        g.add_edge('b', 'c')
+        csr = graph.CSRGraph.from_graph(g)
+        self.assertEqual(4, csr.num_edges)
+        self.assertEqual({'a': 2, 'c': 1}, csr['b'])
+        self.assertEqual(['c', 'b', 'a'], graph.dijkstra(csr, 'c', 'a'))
+
+    def test_float_weights(self):
+        g = graph.DiGraph()
+        g.add_edge(1, 2, 0.5)
+        csr = graph.CSRGraph.from_graph(g)
+        self.assertEqual('d', csr.weights.typecode)
+        self.assertEqual({2: 0.5}, csr[1])
         
 if __name__ == '__main__':
     unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,76 @@
+from euler.utils import grid
+import array
+import unittest
+
+MATRIX = [[131, 673, 234, 103,  18],
+          [201,  96, 342, 965, 150],
+          [630, 803, 746, 422, 111],
+          [537, 699, 497, 121, 956],
+          [805, 732, 524,  37, 331]]
+
+
+class TestMinPathCost(unittest.TestCase):
+
+    def test_right_down(self):
+        self.assertEqual(2427, grid.min_path_cost(MATRIX,
+                                                  moves=grid.RIGHT_DOWN))
+
+    def test_up_down_right(self):
+        left = [(r, 0) for r in range(5)]
+        right = [(r, 4) for r in range(5)]
+        self.assertEqual(994, grid.min_path_cost(MATRIX, left, right,
+                                                 moves=grid.UP_DOWN_RIGHT))
+
+    def test_all_four(self):
+        self.assertEqual(2297, grid.min_path_cost(MATRIX,
+                                                  moves=grid.ALL_FOUR))
+
+    def test_source_is_target(self):
+        self.assertEqual(96, grid.min_path_cost(MATRIX, [(1, 1)], [(1, 1)]))
+
+    def test_unreachable(self):
+        self.assertRaises(ValueError, grid.min_path_cost, MATRIX,
+                          [(4, 4)], [(0, 0)], grid.RIGHT_DOWN)
+
+    def test_ragged_matrix(self):
+        self.assertRaises(ValueError, grid.min_path_cost, [[1, 2], [3]])
+
+
+class TestMinPathSum(unittest.TestCase):
+
+    def test_right_down(self):
+        self.assertEqual(2427, grid.min_path_sum(iter(MATRIX)))
+
+    def test_up_down_right_over_columns(self):
+        columns = zip(*MATRIX)
+        self.assertEqual(994, grid.min_path_sum(columns, grid.UP_DOWN_RIGHT))
+
+    def test_matches_min_path_cost(self):
+        import random
+        rand = random.Random(20)
+        for rows, cols in [(1, 1), (1, 7), (7, 1), (6, 9), (12, 5)]:
+            m = [[rand.randint(1, 99) for _ in range(cols)]
+                 for _ in range(rows)]
+            self.assertEqual(grid.min_path_cost(m, moves=grid.RIGHT_DOWN),
+                             grid.min_path_sum(m))
+            left = [(r, 0) for r in range(rows)]
+            right = [(r, cols-1) for r in range(rows)]
+            self.assertEqual(
+                grid.min_path_cost(m, left, right, grid.UP_DOWN_RIGHT),
+                grid.min_path_sum(zip(*m), grid.UP_DOWN_RIGHT))
+
+    def test_streamed_int_matrix(self):
+        cells = array.array('q', [w for row in MATRIX for w in row])
+        m = grid.utils.io.IntMatrix(cells, 5)
+        self.assertEqual(2427, grid.min_path_sum(m))
+        self.assertEqual(994, grid.min_path_sum(m.columns(),
+                                                grid.UP_DOWN_RIGHT))
+
+    def test_all_four_unsupported(self):
+        self.assertRaises(ValueError, grid.min_path_sum, MATRIX, grid.ALL_FOUR)
+
+    def test_empty(self):
+        self.assertRaises(ValueError, grid.min_path_sum, [])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,57 @@
+from euler.utils.heap import IndexedHeap
+import random
+import unittest
+
+
+class TestIndexedHeap(unittest.TestCase):
+
+    def test_pops_in_priority_order(self):
+        rand = random.Random(17)
+        priorities = [rand.randint(0, 100) for _ in range(200)]
+        h = IndexedHeap()
+        for item, priority in enumerate(priorities):
+            h.push(item, priority)
+        popped = [h.pop()[1] for _ in range(len(priorities))]
+        self.assertEqual(sorted(priorities), popped)
+        self.assertFalse(h)
+
+    def test_decrease_key(self):
+        h = IndexedHeap()
+        for item in range(10):
+            h.push(item, 100 + item)
+        self.assertTrue(h.push(7, 1))
+        self.assertFalse(h.push(7, 50))
+        self.assertEqual(10, len(h))
+        self.assertEqual(1, h.priority(7))
+        self.assertEqual((7, 1), h.pop())
+        self.assertNotIn(7, h)
+        self.assertEqual((0, 100), h.pop())
+
+    def test_random_decreases_against_sorting(self):
+        rand = random.Random(42)
+        h = IndexedHeap()
+        best = {}
+        for _ in range(2000):
+            item, priority = rand.randrange(300), rand.randrange(10**6)
+            h.push(item, priority)
+            best[item] = min(priority, best.get(item, priority))
+        self.assertEqual(len(best), len(h))
+        popped = [h.pop() for _ in range(len(best))]
+        self.assertEqual(sorted(best.items(), key=lambda p: p[1]),
+                         sorted(popped, key=lambda p: p[1]))
+        self.assertEqual(sorted(p for _, p in popped), [p for _, p in popped])
+
+    def test_items_are_never_compared(self):
+        h = IndexedHeap()
+        h.push('START', 0)
+        h.push((0, 0), 0)
+        h.push(None, 0)
+        self.assertEqual(3, len([h.pop() for _ in range(3)]))
+
+    def test_empty(self):
+        h = IndexedHeap()
+        self.assertRaises(IndexError, h.pop)
+        self.assertRaises(IndexError, h.peek)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
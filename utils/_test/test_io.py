@@ -0,0 +1,72 @@
+from euler.utils import grid
+import os
+import shutil
+import tempfile
+import unittest
+
+# grid imports the top-level utils package, so use the io module whose
+# IntMatrix it recognises.
+io = grid.utils.io
+
+TEXT = '131,673,234\n201,96,342\n630,803,746\n'
+ROWS = [[131, 673, 234], [201, 96, 342], [630, 803, 746]]
+
+
+class TestIntMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.text = os.path.join(self.dir, 'matrix.txt')
+        with open(self.text, 'w') as f:
+            f.write(TEXT)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_load_text(self):
+        m = io.load_int_matrix(self.text)
+        self.assertEqual((3, 3), (m.rows, m.cols))
+        self.assertEqual('q', m.data.typecode)
+        self.assertEqual(ROWS, m.tolist())
+        self.assertEqual(342, m[1, 2])
+        self.assertEqual(342, m[1][2])
+        self.assertEqual([234, 342, 746], list(m.column(2)))
+        self.assertEqual([[131, 201, 630], [673, 96, 803], [234, 342, 746]],
+                         [list(col) for col in m.columns()])
+
+    def test_iter_rows(self):
+        rows = io.iter_int_rows(self.text)
+        self.assertEqual(ROWS, [list(row) for row in rows])
+
+    def test_ragged_rows(self):
+        with open(self.text, 'a') as f:
+            f.write('1,2\n')
+        self.assertRaises(ValueError, io.load_int_matrix, self.text)
+
+    def test_binary_round_trip(self):
+        binary = os.path.join(self.dir, 'matrix.bin')
+        io.save_int_matrix(io.load_int_matrix(self.text), binary)
+        m = io.load_int_matrix(binary)
+        self.assertIsInstance(m.data, memoryview)
+        self.assertTrue(m.data.readonly)
+        self.assertEqual(ROWS, m.tolist())
+        self.assertEqual(ROWS, [list(row) for row in io.iter_int_rows(binary)])
+
+    def test_save_list_of_rows(self):
+        binary = os.path.join(self.dir, 'matrix.bin')
+        io.save_int_matrix(ROWS, binary)
+        self.assertEqual(ROWS, io.load_int_matrix(binary).tolist())
+
+    def test_truncated_binary(self):
+        binary = os.path.join(self.dir, 'matrix.bin')
+        io.save_int_matrix(ROWS, binary)
+        with open(binary, 'r+b') as f:
+            f.truncate(os.path.getsize(binary) - 8)
+        self.assertRaises(ValueError, io.load_int_matrix, binary)
+
+    def test_grid_accepts_int_matrix(self):
+        m = io.load_int_matrix(self.text)
+        self.assertEqual(grid.min_path_cost(ROWS), grid.min_path_cost(m))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
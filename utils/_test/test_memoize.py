@@ -0,0 +1,70 @@
+from euler.utils import memoize
+import unittest
+
+
+class TestMemoize(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def make(self, **options):
+        def f(x, y=0):
+            self.calls.append((x, y))
+            return x + y
+        if not options:
+            return memoize(f)
+        return memoize(**options)(f)
+
+    def test_bare_decorator_is_unbounded(self):
+        f = self.make()
+        for x in range(1000):
+            f(x)
+        self.assertEqual(1000, len(f.cache))
+        self.assertEqual(0, f.cache_info().evictions)
+
+    def test_kwargs_are_part_of_key(self):
+        f = self.make()
+        self.assertEqual(1, f(1))
+        self.assertEqual(3, f(1, y=2))
+        self.assertEqual(4, f(1, y=3))
+        self.assertEqual(3, f(1, y=2))
+        self.assertEqual([(1, 0), (1, 2), (1, 3)], self.calls)
+
+    def test_lru_eviction(self):
+        f = self.make(maxsize=2)
+        f(1); f(2); f(1); f(3)
+        self.assertIn((1,), f.cache)
+        self.assertNotIn((2,), f.cache)
+        self.assertEqual((1, 3, 1, 2, 2), tuple(f.cache_info()))
+
+    def test_lfu_eviction(self):
+        f = self.make(maxsize=2, policy='lfu')
+        f(1); f(1); f(2); f(3)
+        self.assertIn((1,), f.cache)
+        self.assertNotIn((2,), f.cache)
+        f(4)
+        self.assertIn((1,), f.cache)
+        self.assertNotIn((3,), f.cache)
+
+    def test_cache_clear(self):
+        f = self.make(maxsize=10)
+        f(1); f(1)
+        f.cache_clear()
+        self.assertEqual((0, 0, 0, 10, 0), tuple(f.cache_info()))
+        f(1)
+        self.assertEqual(2, len(self.calls))
+
+    def test_unknown_policy(self):
+        self.assertRaises(ValueError, memoize, policy='fifo')
+
+    def test_maxsize_must_be_positive(self):
+        for policy in ['lru', 'lfu']:
+            for maxsize in [0, -1]:
+                self.assertRaises(ValueError, memoize, maxsize=maxsize,
+                                  policy=policy)
+            square = memoize(lambda x: x*x, maxsize=1, policy=policy)
+            self.assertEqual([4, 9, 9], [square(2), square(3), square(3)])
+            self.assertEqual((1, 2, 1), square.cache_info()[:3])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,229 @@
+from euler.utils import numtheory
+import itertools
+import math
+import os
+import subprocess
+import sys
+import unittest
+
+
+def brute_primes(n):
+    """ Primes <= n, by the simplest possible (and obviously right) method. """
+    return [p for p in range(2, n+1)
+            if all(p % d for d in range(2, int(p**0.5)+1))]
+
+
+class TestImport(unittest.TestCase):
+
+    def test_import_is_lazy(self):
+        # Import time itself is budgeted by the bench harness (--import-budget)
+        script = 'import utils.numtheory as nt; print(nt._PRIME_TABLE)'
+        repo = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        out = subprocess.check_output([sys.executable, '-c', script],
+                                      cwd=repo, universal_newlines=True)
+        self.assertEqual('None', out.strip())
+
+
+class TestSieve(unittest.TestCase):
+
+    def setUp(self):
+        self.primes = brute_primes(5000)
+
+    def test_soe_is_infinite_and_ordered(self):
+        actual = list(itertools.islice(numtheory.soe(), len(self.primes)))
+        self.assertEqual(self.primes, actual)
+
+    def test_bounded_soe_includes_maximum(self):
+        self.assertEqual([2, 3, 5, 7], list(numtheory.bounded_soe(7)))
+
+    def test_bounded_soe_minimum(self):
+        expect = [p for p in self.primes if 1000 <= p <= 4999]
+        actual = list(numtheory.bounded_soe(4999, 1000))
+        self.assertEqual(expect, actual)
+
+    def test_bounded_soe_float_bounds(self):
+        self.assertEqual(list(numtheory.bounded_soe(30)),
+                         list(numtheory.bounded_soe(30.0)))
+        self.assertEqual([11, 13, 17, 19, 23, 29],
+                         list(numtheory.bounded_soe(30, 10.5)))
+        self.assertEqual([2, 3, 5], list(numtheory.bounded_soe(5.9)))
+
+    def test_primes_in_range(self):
+        for a, b in [(0, 1), (2, 2), (3, 10), (4, 4), (90, 97), (1, 5000)]:
+            expect = [p for p in self.primes if a <= p <= b]
+            self.assertEqual(expect, list(numtheory.primes_in_range(a, b)))
+
+    def test_primes_in_range_spans_segments(self):
+        a, b = 10**6, 10**6 + 3*numtheory._SIEVE_SEGMENT
+        actual = list(numtheory.primes_in_range(a, b))
+        self.assertEqual(1000003, actual[0])
+        self.assertTrue(all(p < q for p, q in zip(actual, actual[1:])))
+        for p in actual[::997]:
+            self.assertTrue(all(p % d for d in range(2, int(p**0.5)+1)))
+
+
+class TestPrimeTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = numtheory.PrimeTable(100)
+
+    def test_grows_geometrically(self):
+        self.table.extend(101)
+        self.assertEqual(200, self.table.limit)
+        self.assertEqual(brute_primes(200), list(self.table.between(2, 200)))
+
+    def test_contains_extends_table(self):
+        self.assertIn(1009, self.table)
+        self.assertNotIn(1011, self.table)
+        self.assertTrue(self.table.limit >= 1011)
+
+    def test_views_survive_growth(self):
+        view = self.table.between(2, 10)
+        self.table.extend(10**5)
+        self.assertEqual([2, 3, 5, 7], list(view))
+        self.assertEqual(9592, len(self.table))
+
+    def test_primelist(self):
+        self.assertEqual([7, 11, 13], list(numtheory.primelist(6, 13)))
+        self.assertEqual([], list(numtheory.primelist(24, 28)))
+
+    def test_isprime(self):
+        primes = set(brute_primes(5000))
+        for n in range(5000):
+            self.assertEqual(n in primes, numtheory.isprime(n))
+
+
+class TestMillerRabin(unittest.TestCase):
+
+    def test_matches_sieve(self):
+        primes = set(brute_primes(20000))
+        for n in range(20000):
+            self.assertEqual(n in primes, numtheory.miller_rabin(n))
+
+    def test_strong_pseudoprimes(self):
+        # Each of these fools every witness in the witness set just below it
+        for n in [2047, 1373653, 25326001, 3215031751, 2152302898747,
+                  3474749660383, 341550071728321, 3825123056546413051,
+                  318665857834031151167461, 3317044064679887385961981]:
+            self.assertFalse(numtheory.miller_rabin(n))
+
+    def test_large_primes(self):
+        for n in [10**8+7, 10**9+7, 2**61-1, 2**89-1]:
+            self.assertTrue(numtheory.isprime(n))
+            self.assertFalse(numtheory.isprime(n*(n+2)))
+
+    def test_isprime_does_not_grow_table(self):
+        limit = numtheory._prime_table().limit
+        numtheory.isprime(10**15+37)
+        self.assertEqual(limit, numtheory._prime_table().limit)
+
+    def test_trial_div_prime_tester_falls_back(self):
+        prime_tester = numtheory.TrialDivPrimeTester(2)
+        self.assertTrue(prime_tester(10007))
+        self.assertFalse(prime_tester(10001))
+
+
+class TestFactorize(unittest.TestCase):
+
+    def assertFactorization(self, n, factors):
+        product = 1
+        for p, e in factors.items():
+            self.assertTrue(numtheory.isprime(p))
+            product *= p**e
+        self.assertEqual(n, product)
+
+    def test_results_are_not_shared(self):
+        for method in ('trial', 'rho'):
+            factors = numtheory.factorize(360, method=method)
+            factors[2] = 99
+            self.assertEqual({2: 3, 3: 2, 5: 1},
+                             numtheory.factorize(360, method=method))
+        divisors = numtheory.divisors(12)
+        divisors.append(99)
+        self.assertEqual([1, 2, 3, 4, 6, 12], numtheory.divisors(12))
+
+    def test_methods_agree(self):
+        for n in range(1, 3000):
+            expect = numtheory.factorize(n, method='trial')
+            self.assertEqual(expect, numtheory.factorize(n, method='rho'))
+            self.assertEqual(expect, numtheory.factorize(n))
+
+    def test_sixteen_digits(self):
+        n = 1000000016000000063 * 3 * 3
+        self.assertEqual({3: 2, 1000000007: 1, 1000000009: 1},
+                         numtheory.factorize(n))
+
+    def test_prime_powers_and_semiprimes(self):
+        for n in [7919**4, 2**64+1, 104723*104729, 999983**2 * 1000003]:
+            self.assertFactorization(n, numtheory.factorize(n))
+
+    def test_unknown_method(self):
+        self.assertRaises(ValueError, numtheory.factorize, 12, method='ecm')
+
+
+class TestFactorTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = numtheory.FactorTable(10000)
+
+    def test_matches_trial_division(self):
+        for n in range(1, 10001):
+            self.assertEqual(numtheory.trial_division(n),
+                             self.table.factorize(n))
+
+    def test_smallest_prime_factor(self):
+        self.assertEqual(2, self.table.smallest_prime_factor(9998))
+        self.assertEqual(97, self.table.smallest_prime_factor(97*101))
+        self.assertEqual(9973, self.table.smallest_prime_factor(9973))
+
+    def test_factorize_uses_active_table(self):
+        with self.table:
+            self.assertEqual({2: 4, 5: 4}, numtheory.factorize(10000))
+            self.assertEqual({2: 4, 5: 4},
+                             numtheory.factorize(10000, method='table'))
+            # Beyond the table, factorize falls back to the other methods
+            self.assertEqual({10007: 1}, numtheory.factorize(10007))
+        self.assertRaises(ValueError, numtheory.factorize, 10000,
+                          method='table')
+
+
+class TestRangeSieves(unittest.TestCase):
+
+    N = 1000
+
+    def test_divisor_count_range(self):
+        table = numtheory.divisor_count_range(self.N)
+        for n in range(1, self.N+1):
+            self.assertEqual(numtheory.num_of_divisors(n), table[n])
+
+    def test_divisor_sum_range(self):
+        table = numtheory.divisor_sum_range(self.N)
+        squares = numtheory.divisor_sum_range(self.N, 2)
+        for n in range(1, self.N+1):
+            self.assertEqual(numtheory.sum_of_divisors(n), table[n])
+            self.assertEqual(sum(d*d for d in numtheory.divisors(n)),
+                             squares[n])
+
+    def test_totient_range(self):
+        table = numtheory.totient_range(self.N)
+        for n in range(1, self.N+1):
+            expect = sum(1 for k in range(1, n+1) if math.gcd(k, n) == 1)
+            self.assertEqual(expect, table[n])
+
+    def test_mobius_and_omega_range(self):
+        mu = numtheory.mobius_range(self.N)
+        omega = numtheory.omega_range(self.N)
+        for n in range(1, self.N+1):
+            factors = numtheory.factorize(n)
+            squarefree = all(e == 1 for e in factors.values())
+            self.assertEqual((-1)**len(factors) if squarefree else 0, mu[n])
+            self.assertEqual(len(factors), omega[n])
+
+    def test_large_sigma_k_falls_back_to_list(self):
+        table = numtheory.divisor_sum_range(100, 12)
+        self.assertEqual(sum(d**12 for d in numtheory.divisors(96)),
+                         table[96])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
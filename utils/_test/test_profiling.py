@@ -0,0 +1,60 @@
+from euler.utils import profiling
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+
+def busy(n):
+    return sum(i*i for i in range(n))
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.prefix = os.path.join(self.dir, 'busy')
+        self.stream = io.StringIO()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def profile(self, mode, n=200000):
+        return profiling.profile_call(busy, (n,), {}, mode, self.prefix,
+                                      self.stream)
+
+    def test_cprofile(self):
+        self.assertEqual(busy(200000), self.profile('cprofile'))
+        self.assertTrue(os.path.exists(self.prefix + '.pstats'))
+        self.assertIn('busy', self.stream.getvalue())
+
+    def test_tracemalloc(self):
+        self.assertEqual(busy(200000), self.profile('tracemalloc'))
+        self.assertTrue(os.path.exists(self.prefix + '.tracemalloc'))
+        self.assertIn('Peak traced memory', self.stream.getvalue())
+
+    def test_sampling(self):
+        # Long enough (a few hundred ms) to be sure of many 5ms samples.
+        n = 3000000
+        self.assertEqual(busy(n), self.profile('sampling', n))
+        with open(self.prefix + '.folded') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines, 'no stacks were recorded')
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith('busy '))
+            self.assertTrue(int(count) > 0)
+
+    def test_unknown_mode(self):
+        self.assertRaises(ValueError, self.profile, 'perf')
+
+    def test_mode_from_argv(self):
+        self.assertEqual('sampling',
+                         profiling.mode_from_argv(['--profile=sampling']))
+        self.assertEqual('cprofile',
+                         profiling.mode_from_argv(['x', '--profile', 'cprofile']))
+        self.assertIsNone(profiling.mode_from_argv(['--json', 'out.json']))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
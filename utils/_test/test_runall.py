@@ -0,0 +1,109 @@
+from euler.utils import runall
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+STUBS = {
+    'ok': '''
+import utils
+
+def ANSWER():
+    return 42
+
+    def test_main(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = runall.main(['--repo-dir', self.dir, self.names['ok']])
+        self.assertEqual(0, status)
+        self.assertIn('1 of 1 problems solved', out.getvalue())
+
+if __name__ == '__main__':
+    utils.solution_printer(ANSWER)
+''',
+    'error': '''
+import utils
+
+def ANSWER():
+    raise ArithmeticError('no answer')
+
+    def test_main(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = runall.main(['--repo-dir', self.dir, self.names['ok']])
+        self.assertEqual(0, status)
+        self.assertIn('1 of 1 problems solved', out.getvalue())
+
+if __name__ == '__main__':
+    utils.solution_printer(ANSWER)
+''',
+    'slow': '''
+import time
+import utils
+
+def ANSWER():
+    time.sleep(30)
+
+    def test_main(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = runall.main(['--repo-dir', self.dir, self.names['ok']])
+        self.assertEqual(0, status)
+        self.assertIn('1 of 1 problems solved', out.getvalue())
+
+if __name__ == '__main__':
+    utils.solution_printer(ANSWER)
+''',
+}
+
+
+class TestRunAll(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.names = {}
+        for kind, source in STUBS.items():
+            name = 'stub_' + kind
+            with open(os.path.join(self.dir, name + '.py'), 'w') as f:
+                f.write(source)
+            self.names[kind] = name
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def run_all(self, names, **kwargs):
+        return runall.run_all(names, repo_dir=self.dir, **kwargs)
+
+    def test_ok(self):
+        result, = self.run_all([self.names['ok']], timeout=30)
+        self.assertEqual('ok', result['status'])
+        self.assertEqual('42', result['answer'])
+        self.assertEqual(self.names['ok'], result['problem'])
+
+    def test_error(self):
+        result, = self.run_all([self.names['error']], timeout=30)
+        self.assertEqual('error', result['status'])
+        self.assertIn('no answer', result['error'])
+
+    def test_timeout(self):
+        result, = self.run_all([self.names['slow']], timeout=0.5)
+        self.assertEqual('timeout', result['status'])
+        self.assertLess(result['wall_seconds'], 30)
+
+    def test_results_keep_order(self):
+        names = [self.names['error'], self.names['ok']]
+        results = self.run_all(names, workers=2, timeout=30)
+        self.assertEqual(names, [r['problem'] for r in results])
+        self.assertEqual(['error', 'ok'], [r['status'] for r in results])
+
+    def test_main(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = runall.main(['--repo-dir', self.dir, self.names['ok']])
+        self.assertEqual(0, status)
+        self.assertIn('1 of 1 problems solved', out.getvalue())
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
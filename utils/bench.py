@@ -0,0 +1,294 @@
+""" Benchmark harness for the problem solutions.
+
+Each problem module is benchmarked in its own interpreter, so peak memory and
+import costs are measured in isolation. The answer function is found by
+running the module's `if __name__ == '__main__'` block with solution_printer
+intercepted, so whatever function and arguments that block passes to
+solution_printer are exactly what gets timed.
+
+From the repository root:
+    python bench.py p50 p87 --repeat 5 --json results.json
+    python bench.py --compare results.json p50 p87
+or, with the repository importable as the euler package:
+    python -m euler.bench p50 p87
+"""
+from __future__ import print_function
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+import utils.profiling
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The README's rule: every solution runs in under a minute
+TIME_BUDGET = 60.0
+# Seconds a problem module may spend on import before its answer is run
+IMPORT_BUDGET = 1.0
+
+
+class _Captured(Exception):
+    """ Raised by the stand-in solution_printer to stop the main block. """
+    def __init__(self, ans_func, args, kwargs):
+        Exception.__init__(self)
+        self.call = (ans_func, tuple(args), dict(kwargs))
+
+
+def discover(repo_dir=None):
+    """ Names of the problem modules in repo_dir (default: the repository),
+    i.e. the top-level modules whose main block calls solution_printer. """
+    repo_dir = repo_dir or REPO_DIR
+    names = []
+    for filename in sorted(os.listdir(repo_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext != '.py' or name in ('__init__', 'bench', 'runall'):
+            continue
+        with io.open(os.path.join(repo_dir, filename),
+                     encoding='utf-8', errors='replace') as f:
+            if 'solution_printer(' in f.read():
+                names.append(name)
+    return names
+
+
+def find_answer(name, repo_dir=None):
+    """ Imports problem module name from repo_dir (default: the repository)
+    and returns (ans_func, args, kwargs): the call its main block hands to
+    solution_printer.
+
+    Must be run with the repository root as the working directory, since
+    problem modules import utils (or euler.utils) and open data files by
+    relative path. """
+    import runpy
+    repo_dir = repo_dir or REPO_DIR
+    path = os.path.join(repo_dir, name + '.py')
+    if not os.path.exists(path):
+        raise ValueError('No problem module %s' % path)
+    for directory in (repo_dir, os.path.dirname(repo_dir)):
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+    def capture(ans_func, args=(), kwargs={}):
+        raise _Captured(ans_func, args, kwargs)
+    patched = []
+    for pkg_name in ('utils', 'euler.utils'):
+        try:
+            pkg = __import__(pkg_name, fromlist=['solution_printer'])
+        except ImportError:
+            continue
+        patched.append((pkg, pkg.solution_printer))
+        pkg.solution_printer = capture
+    try:
+        runpy.run_path(path, run_name='__main__')
+    except _Captured as captured:
+        return captured.call
+    finally:
+        for pkg, printer in patched:
+            pkg.solution_printer = printer
+    raise ValueError('%s never calls solution_printer' % name)
+
+
+def _percentile(sorted_values, q):
+    """ Nearest-rank percentile of an already sorted list. """
+    rank = max(1, int(-(-q * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure(name, repeat=3, warmup=1, profile=None, profile_dir='.'):
+    """ Benchmarks problem name in this process and returns a dict of results.
+    Output printed by the solution is swallowed.
+
+    With profile (a utils.profiling mode), one further run is profiled. Its
+    files go in profile_dir, named after the problem, with the hot spot
+    table in NAME.MODE.txt. """
+    import tracemalloc
+    result = {'problem': name}
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        start = time.perf_counter()
+        ans_func, args, kwargs = find_answer(name)
+        result['import_seconds'] = time.perf_counter() - start
+        for _ in range(warmup):
+            ans_func(*args, **kwargs)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            answer = ans_func(*args, **kwargs)
+            times.append(time.perf_counter() - start)
+        # One more, untimed, run to count allocations
+        blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+        ans_func(*args, **kwargs)
+        result['alloc_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        result['alloc_blocks'] = sys.getallocatedblocks() - blocks
+        if profile:
+            prefix = os.path.join(profile_dir, name)
+            report = '%s.%s.txt' % (prefix, profile)
+            with open(report, 'w') as stream:
+                utils.profiling.profile_call(ans_func, args, kwargs, profile,
+                                             prefix, stream)
+            result['profile'] = report
+    finally:
+        sys.stdout = stdout
+    times.sort()
+    result.update(answer=repr(answer), times=times, min=times[0],
+                  median=times[len(times)//2] if len(times) % 2 else
+                         (times[len(times)//2 - 1] + times[len(times)//2])/2,
+                  p95=_percentile(times, 95), peak_rss_bytes=_peak_rss_bytes())
+    return result
+
+
+def run(name, repeat=3, warmup=1, timeout=None, profile=None,
+        profile_dir='.'):
+    """ Benchmarks problem name in a fresh interpreter and returns its result
+    dict. Failures are reported in the dict under 'error'. """
+    cmd = [sys.executable, '-m', 'utils.bench', '--child',
+           '--repeat', str(repeat), '--warmup', str(warmup), name]
+    if profile:
+        if not os.path.isdir(profile_dir):
+            os.makedirs(profile_dir)
+        cmd += ['--profile', profile,
+                '--profile-dir', os.path.abspath(profile_dir)]
+    try:
+        proc = subprocess.run(cmd, cwd=REPO_DIR, stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, timeout=timeout,
+                              universal_newlines=True)
+    except subprocess.TimeoutExpired:
+        return {'problem': name, 'error': 'timed out after %ss' % timeout}
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines() or ['exit %s' % proc.returncode]
+        return {'problem': name, 'error': lines[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def check_budgets(result, time_budget=TIME_BUDGET,
+                  import_budget=IMPORT_BUDGET):
+    """ Records in result whether it met the time and import budgets. """
+    result['within_budget'] = ('error' not in result and
+                               result['median'] < time_budget and
+                               result['import_seconds'] < import_budget)
+    return result['within_budget']
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR,
+            stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _format_seconds(seconds):
+    return '%9.4fs' % seconds
+
+
+def print_table(results, baseline=None):
+    """ Prints one row per result; with a baseline (results keyed by problem)
+    also prints each median as a ratio to the baseline median. """
+    header = '%-8s %10s %10s %10s %10s %8s  %s' % (
+        'problem', 'min', 'median', 'p95', 'import', 'rss(MB)', 'answer')
+    print(header)
+    print('-'*len(header))
+    for r in results:
+        if 'error' in r:
+            print('%-8s ERROR: %s' % (r['problem'], r['error']))
+            continue
+        rss = r['peak_rss_bytes']
+        line = '%-8s %10s %10s %10s %10s %8s  %s' % (
+            r['problem'], _format_seconds(r['min']),
+            _format_seconds(r['median']), _format_seconds(r['p95']),
+            _format_seconds(r['import_seconds']),
+            '-' if rss is None else '%.1f' % (rss / 2.0**20), r['answer'])
+        old = (baseline or {}).get(r['problem'])
+        if old and 'median' in old:
+            line += '  (%.2fx baseline)' % (r['median'] / old['median'])
+        if not r.get('within_budget', True):
+            line += '  OVER BUDGET'
+        print(line)
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError('%s is not a positive integer' % text)
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark Project Euler solutions.')
+    parser.add_argument('problems', nargs='*',
+                        help='problem modules, e.g. p50 (default: all)')
+    parser.add_argument('--repeat', type=_positive_int, default=3,
+                        help='timed runs per problem')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='untimed runs before timing')
+    parser.add_argument('--json', metavar='PATH',
+                        help='write results as JSON to PATH')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='compare against a JSON file from a previous run')
+    parser.add_argument('--budget', type=float, default=TIME_BUDGET,
+                        help='max median seconds per problem')
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET,
+                        help='max seconds to import a problem module')
+    parser.add_argument('--profile', choices=utils.profiling.PROFILERS,
+                        help='profile one extra run of each problem')
+    parser.add_argument('--profile-dir', default='.',
+                        help='where to write profiles (default: .)')
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = measure(args.problems[0], args.repeat, args.warmup,
+                         args.profile, args.profile_dir)
+        print(json.dumps(result))
+        return 0
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = dict((r['problem'], r) for r in json.load(f)['results'])
+    results = []
+    for name in args.problems or discover():
+        # Allow for every run, warm-up and instrumented, to use the budget
+        timeout = args.budget * (args.repeat + args.warmup + 1) + 60
+        if args.profile:
+            timeout += args.budget * 10 # Profiled runs are much slower
+        result = run(name, args.repeat, args.warmup, timeout, args.profile,
+                     args.profile_dir)
+        check_budgets(result, args.budget, args.import_budget)
+        results.append(result)
+    print_table(results, baseline)
+    for r in results:
+        if 'profile' in r:
+            print('Profile of %s: %s' % (r['problem'], r['profile']))
+    if args.json:
+        report = {'commit': _git_commit(), 'python': sys.version.split()[0],
+                  'repeat': args.repeat, 'warmup': args.warmup,
+                  'budget': args.budget, 'import_budget': args.import_budget,
+                  'results': results}
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if all(r['within_budget'] for r in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
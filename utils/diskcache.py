@@ -0,0 +1,129 @@
+""" Opt-in on-disk cache for expensive number-theory tables.
+
+Tables (primes, smallest prime factors, totients, ...) are stored as raw
+native-endian binary files named by table, typecode and limit, e.g.
+    $XDG_CACHE_HOME/euler/primes-I-1000000.bin
+and are memory-mapped read-only when loaded, so a second run gets its tables
+back without re-sieving or even reading them into memory up front.
+
+The cache is off unless the EULER_DISK_CACHE environment variable is set to
+something other than '' or '0', or enable() is called. EULER_CACHE_DIR
+overrides the cache location.
+"""
+
+import array
+import mmap
+import os
+
+ENV_ENABLE = 'EULER_DISK_CACHE'
+ENV_DIR = 'EULER_CACHE_DIR'
+
+# None means "defer to the environment"
+_enabled = None
+_directory = None
+
+
+def enable(directory=None):
+    """ Turns the disk cache on, optionally in a specific directory. """
+    global _enabled, _directory
+    _enabled = True
+    _directory = directory
+
+
+def disable():
+    """ Turns the disk cache off, whatever the environment says. """
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    if _enabled is not None:
+        return _enabled
+    return os.environ.get(ENV_ENABLE, '') not in ('', '0')
+
+
+def cache_dir():
+    """ Directory holding the cached tables. """
+    if _directory is not None:
+        return _directory
+    if os.environ.get(ENV_DIR):
+        return os.environ[ENV_DIR]
+    base = (os.environ.get('XDG_CACHE_HOME') or
+            os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'euler')
+
+
+def _path(name, limit, typecode):
+    return os.path.join(cache_dir(), '%s-%s-%d.bin' % (name, typecode, limit))
+
+
+def load(name, limit, typecode):
+    """ Returns the cached table as a read-only memoryview of the given
+    typecode, backed by a memory map of the file, or None if it isn't
+    cached (or the file is damaged). """
+    path = _path(name, limit, typecode)
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size % array.array(typecode).itemsize:
+                return None
+            if size == 0:
+                return memoryview(array.array(typecode))
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, OSError, ValueError):
+        return None
+    return memoryview(mapped).cast(typecode)
+
+
+def save(name, limit, table):
+    """ Writes table (an array or memoryview) to the cache. The file is
+    written under a temporary name and renamed into place, so concurrent
+    readers never see a partial table. """
+    import tempfile # Only needed when writing, so keep it off import path
+    directory = cache_dir()
+    tmp_path = None
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(memoryview(table).cast('B'))
+        os.replace(tmp_path, _path(name, limit, table_typecode(table)))
+    except (IOError, OSError):
+        # The cache is only an optimization; failing to write it is fine,
+        # as long as no partial file is left behind.
+        if tmp_path is not None and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def table_typecode(table):
+    """ The array typecode of an array or memoryview. """
+    if isinstance(table, array.array):
+        return table.typecode
+    return table.format
+
+
+def cached(name, limit, typecode, build):
+    """ Returns the table called name for limit, from the cache if enabled
+    and present. Otherwise calls build() to make it (storing it in the cache
+    if enabled). build must return an array of the given typecode. """
+    if not enabled():
+        return build()
+    table = load(name, limit, typecode)
+    if table is None:
+        table = build()
+        save(name, limit, table)
+    return table
+
+
+def clear():
+    """ Deletes every cached table. """
+    directory = cache_dir()
+    if not os.path.isdir(directory):
+        return
+    for filename in os.listdir(directory):
+        if filename.endswith('.bin') or filename.endswith('.tmp'):
+            os.remove(os.path.join(directory, filename))
@@ -1,5 +1,9 @@
 from __future__ import print_function
+import array
 import heapq
+import types
+
+import utils.heap
 
 def path_cost(graph, path):
     path_weights = []
@@ -9,42 +13,684 @@ def path_cost(graph, path):
     return sum(path_weights)
             
 
-def dijkstra(graph, start, goal):
-    opened = [(0, start, None)]
-    closed = {}
-    explored = {}
+def _initial_distances(sources):
+    """ Normalises a sources argument: a dict of node -> starting distance
+    is used as is, any other iterable of nodes starts them all at 0. """
+    if isinstance(sources, dict):
+        return sources
+    return dict.fromkeys(sources, 0)
+
+def _csr_search(graph, sources, goals=None):
+    """ Dijkstra's algorithm over a CSRGraph, on integer node ids and flat
+    arrays throughout. sources is a dict of id -> starting distance and goals
+    a set of ids (or None to search everything reachable).
+
+    Returns (reached, dist, parent, done): the first goal id settled (or
+    None), the list of distances, the array of parent ids (-1 for sources and
+    unreached nodes), and a bytearray flagging the settled nodes. """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    n = len(graph.nodes)
+    dist = [None] * n
+    parent = array.array('q', [-1]) * n
+    done = bytearray(n)
+    opened = []
+    for u, d in sources.items():
+        if dist[u] is None or d < dist[u]:
+            dist[u] = d
+            opened.append((d, u))
+    heapq.heapify(opened)
     while opened:
-        dist, curr_node, parent = heapq.heappop(opened)
-        if curr_node == goal:
-            path = [curr_node]
-            node = parent
-            while node is not None:
-                path.append(node)
-                node = explored[node]
-            path.reverse()
-            return path
-        if curr_node in explored:
+        d, u = heapq.heappop(opened)
+        if done[u]:
             continue
-        explored[curr_node] = parent
-        for neighbor in graph[curr_node]:
-            if neighbor in explored:
+        done[u] = 1
+        if goals is not None and u in goals:
+            return u, dist, parent, done
+        for i in range(offsets[u], offsets[u+1]):
+            v = targets[i]
+            if done[v]:
+                continue
+            new_cost = d + weights[i]
+            if dist[v] is None or new_cost < dist[v]:
+                dist[v] = new_cost
+                parent[v] = u
+                heapq.heappush(opened, (new_cost, v))
+    return None, dist, parent, done
+
+def _search(graph, sources, targets=None):
+    """ Dijkstra's algorithm from several sources at once, stopping when the
+    first of targets (if given) is settled.
+
+    Returns (reached, dist, pred): the target reached (or None), and dicts
+    giving the distance to, and predecessor of, every settled node. Sources
+    have predecessor None. """
+    sources = _initial_distances(sources)
+    if isinstance(graph, CSRGraph):
+        index, nodes = graph.index, graph.nodes
+        goals = None if targets is None else set(index[t] for t in targets)
+        reached, dist, parent, done = _csr_search(
+            graph, dict((index[s], d) for s, d in sources.items()), goals)
+        settled = [i for i in range(len(nodes)) if done[i]]
+        return (None if reached is None else nodes[reached],
+                dict((nodes[i], dist[i]) for i in settled),
+                dict((nodes[i], nodes[parent[i]] if parent[i] >= 0 else None)
+                     for i in settled))
+    targets = None if targets is None else set(targets)
+    opened = utils.heap.IndexedHeap()
+    for s, d in sources.items():
+        opened.push(s, d)
+    parents = dict.fromkeys(sources)
+    dist, pred = {}, {}
+    while opened:
+        u, d = opened.pop()
+        dist[u] = d
+        pred[u] = parents[u]
+        if targets is not None and u in targets:
+            return u, dist, pred
+        for v, weight in graph[u].items():
+            if v not in dist and opened.push(v, d + weight):
+                parents[v] = u
+    return None, dist, pred
+
+def path_to(pred, node):
+    """ Follows a predecessor map back from node to its source, returning
+    the path from the source to node as a list. """
+    path = [node]
+    while pred[path[-1]] is not None:
+        path.append(pred[path[-1]])
+    path.reverse()
+    return path
+
+def shortest_distance(graph, sources, targets, return_maps=False):
+    """ Returns the length of a shortest path from any of sources to any of
+    targets, searching outward from all the sources at once and stopping at
+    the first target reached.
+
+    sources may be a dict of node -> starting distance, to charge a cost for
+    starting at each source (e.g. the weight of a starting grid cell);
+    otherwise every source starts at distance 0.
+
+    With return_maps, returns (distance, target, dist, pred) instead: the
+    target reached, and the distance and predecessor maps of every node
+    settled during the search (use path_to(pred, target) for the path).
+
+    >>> g = DiGraph()
+    >>> for u, v, w in [('a', 'c', 5), ('b', 'c', 1), ('c', 'd', 1),
+    ...                 ('c', 'e', 4)]:
+    ...     g.add_edge(u, v, w)
+    >>> shortest_distance(g, ['a', 'b'], ['d', 'e'])
+    2
+    >>> distance, target, dist, pred = shortest_distance(
+    ...     g, {'a': 0, 'b': 10}, ['d', 'e'], return_maps=True)
+    >>> distance, target, path_to(pred, target)
+    (6, 'd', ['a', 'c', 'd'])
+    """
+    reached, dist, pred = _search(graph, sources, targets)
+    if reached is None:
+        raise Exception('No node of %s reachable from %s' % (targets, sources))
+    if return_maps:
+        return dist[reached], reached, dist, pred
+    return dist[reached]
+
+def shortest_path_tree(graph, sources):
+    """ Runs Dijkstra's algorithm from sources (as for shortest_distance) over
+    everything reachable. Returns (dist, pred), the distance to and
+    predecessor of every reachable node. """
+    _, dist, pred = _search(graph, sources)
+    return dist, pred
+
+def dijkstra(graph, start, goal):
+    """ Returns a shortest path from start to goal, as a list of nodes.
+
+    graph may be a Graph, a DiGraph or a CSRGraph. """
+    if isinstance(graph, CSRGraph):
+        reached, _, parent, _ = _csr_search(graph, {graph.index[start]: 0},
+                                            set([graph.index[goal]]))
+        if reached is None:
+            raise Exception('Node %s not reachable from %s' % (goal, start))
+        path = [reached]
+        while parent[path[-1]] >= 0:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return [graph.nodes[i] for i in path]
+    reached, _, pred = _search(graph, [start], [goal])
+    if reached is None:
+        raise Exception('Node %s not reachable from %s' % (goal, start))
+    return path_to(pred, goal)
+
+def zero_heuristic(node, goal):
+    """ The trivial heuristic: astar() with it is Dijkstra's algorithm. """
+    return 0
+
+def manhattan_heuristic(min_weight=1):
+    """ Returns a heuristic for grid graphs whose nodes are (row, col) cells
+    and whose steps go to a neighbouring cell: every step costs at least
+    min_weight (e.g. the smallest cell of the matrix), so min_weight times
+    the Manhattan distance to the goal never overestimates.
+
+    >>> h = manhattan_heuristic(3)
+    >>> h((0, 0), (4, 2))
+    18
+    """
+    def heuristic(node, goal):
+        return min_weight * (abs(goal[0] - node[0]) + abs(goal[1] - node[1]))
+    return heuristic
+
+def astar(graph, start, goal, heuristic=zero_heuristic, stats=None):
+    """ Returns a shortest path from start to goal, as a list of nodes, found
+    with A* search. heuristic(node, goal) must be a consistent lower bound
+    on the distance from node to goal (see manhattan_heuristic), so that the
+    search can head towards goal instead of outward in every direction.
+
+    If stats is a dict, it is filled in with the path's 'distance' and the
+    number of nodes 'expanded'.
+
+    >>> g = DiGraph()
+    >>> for u, v, w in [((0, 0), (0, 1), 5), ((0, 1), (1, 1), 2),
+    ...                 ((0, 0), (1, 0), 2), ((1, 0), (1, 1), 2)]:
+    ...     g.add_edge(u, v, w)
+    >>> stats = {}
+    >>> astar(g, (0, 0), (1, 1), manhattan_heuristic(2), stats)
+    [(0, 0), (1, 0), (1, 1)]
+    >>> stats['distance'], stats['expanded']
+    (4, 3)
+    """
+    # Priorities are (estimate, -cost so far): among equal estimates the
+    # deepest node is expanded first. As heuristic(v, goal) is fixed, a
+    # lower priority for v always means a shorter path to it.
+    opened = utils.heap.IndexedHeap()
+    opened.push(start, (heuristic(start, goal), 0))
+    parents = {start: None}
+    pred = {}
+    while opened:
+        u, (_, d) = opened.pop()
+        d = -d
+        pred[u] = parents[u]
+        if u == goal:
+            if stats is not None:
+                stats['distance'] = d
+                stats['expanded'] = len(pred)
+            return path_to(pred, goal)
+        for v, weight in graph[u].items():
+            if v in pred:
                 continue
-            new_cost = dist + graph[curr_node][neighbor]
-            if neighbor in closed:
-                old_cost = closed[neighbor]
-                if old_cost <= new_cost:
+            new_cost = d + weight
+            if opened.push(v, (new_cost + heuristic(v, goal), -new_cost)):
+                parents[v] = u
+    raise Exception('Node %s not reachable from %s' % (goal, start))
+
+def bidirectional_dijkstra(graph, start, goal, stats=None):
+    """ Returns a shortest path from start to goal, as a list of nodes, by
+    searching forward from start and backward from goal at once until the
+    two searches meet. graph may be a Graph or a DiGraph; a DiGraph is
+    searched backward over its predecessor dict, so nothing is rebuilt.
+
+    If stats is a dict, it is filled in with the path's 'distance' and the
+    number of nodes 'expanded' by both searches together.
+
+    >>> g = DiGraph()
+    >>> for u, v, w in [('s', 'a', 1), ('a', 'b', 1), ('b', 't', 1),
+    ...                 ('s', 't', 5)]:
+    ...     g.add_edge(u, v, w)
+    >>> bidirectional_dijkstra(g, 's', 't')
+    ['s', 'a', 'b', 't']
+    """
+    if start == goal:
+        if stats is not None:
+            stats['distance'], stats['expanded'] = 0, 0
+        return [start]
+    # Index 0 is the forward search, 1 the backward one
+    adjacency = (graph._adj, getattr(graph, '_pred', graph._adj))
+    opened = (utils.heap.IndexedHeap(), utils.heap.IndexedHeap())
+    opened[0].push(start, 0)
+    opened[1].push(goal, 0)
+    best = ({start: 0}, {goal: 0})
+    parents = ({start: None}, {goal: None})
+    done = (set(), set())
+    shortest, meet = None, None
+    while opened[0] and opened[1]:
+        top = (opened[0].peek()[1], opened[1].peek()[1])
+        # No path through unsettled nodes can beat the best one seen
+        if shortest is not None and top[0] + top[1] >= shortest:
+            break
+        side = 0 if top[0] <= top[1] else 1
+        other = best[1 - side]
+        u, d = opened[side].pop()
+        done[side].add(u)
+        for v, weight in adjacency[side][u].items():
+            if v in done[side]:
+                continue
+            if opened[side].push(v, d + weight):
+                best[side][v] = d + weight
+                parents[side][v] = u
+            if v in other:
+                length = best[side][v] + other[v]
+                if shortest is None or length < shortest:
+                    shortest, meet = length, v
+    if shortest is None:
+        raise Exception('Node %s not reachable from %s' % (goal, start))
+    if stats is not None:
+        stats['distance'] = shortest
+        stats['expanded'] = len(done[0]) + len(done[1])
+    path = path_to(parents[0], meet)
+    node = parents[1][meet]
+    while node is not None:
+        path.append(node)
+        node = parents[1][node]
+    return path
+
+class ShortestPathIndex(object):
+    """ The shortest paths from one source to every node reachable from it,
+    computed once by Dijkstra's algorithm and kept, so that any number of
+    distance(goal) and path(goal) queries can be answered without searching
+    again: distance in O(1), path in O(path length).
+
+    >>> g = DiGraph()
+    >>> for u, v, w in [('a', 'b', 1), ('b', 'c', 1), ('a', 'c', 5)]:
+    ...     g.add_edge(u, v, w)
+    >>> index = ShortestPathIndex(g, 'a')
+    >>> index.distance('c'), index.path('c')
+    (2, ['a', 'b', 'c'])
+    >>> 'a' in ShortestPathIndex(g, 'c')
+    False
+    """
+
+    def __init__(self, graph, source):
+        self.source = source
+        self.dist, self.pred = shortest_path_tree(graph, [source])
+
+    def __contains__(self, goal):
+        """ Whether goal is reachable from the source. """
+        return goal in self.dist
+
+    def distance(self, goal):
+        if goal not in self.dist:
+            raise Exception('Node %s not reachable from %s'
+                            % (goal, self.source))
+        return self.dist[goal]
+
+    def path(self, goal):
+        """ Returns a shortest path from the source to goal, as a list of
+        nodes. """
+        if goal not in self.pred:
+            raise Exception('Node %s not reachable from %s'
+                            % (goal, self.source))
+        return path_to(self.pred, goal)
+
+    @classmethod
+    def build_many(cls, graph, sources, workers=None):
+        """ Returns a dict of source -> ShortestPathIndex for each of sources,
+        building them in a pool of up to workers processes (default: the
+        number of CPUs). The graph is sent to each worker once, not once per
+        source. With workers=1 everything is built in this process. """
+        import os
+        sources = list(sources)
+        workers = min(workers or os.cpu_count() or 1, len(sources))
+        if workers <= 1:
+            return dict((source, cls(graph, source)) for source in sources)
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers, initializer=_set_pool_graph,
+                                 initargs=(graph,)) as pool:
+            chunksize = max(1, len(sources) // (4*workers))
+            return dict(zip(sources, pool.map(_pool_index, sources,
+                                              chunksize=chunksize)))
+
+class DynamicShortestPaths(ShortestPathIndex):
+    """ A ShortestPathIndex that stays correct as edge weights change. Change
+    weights through update_weight, which repairs the shortest path tree only
+    where the change reaches, rather than searching the whole graph again.
+
+    >>> g = DiGraph()
+    >>> for u, v, w in [('a', 'b', 1), ('b', 'c', 1), ('a', 'c', 5)]:
+    ...     g.add_edge(u, v, w)
+    >>> paths = DynamicShortestPaths(g, 'a')
+    >>> paths.update_weight('a', 'b', 10)
+    2
+    >>> paths.distance('c'), paths.path('c')
+    (5, ['a', 'c'])
+    """
+
+    def __init__(self, graph, source):
+        super(DynamicShortestPaths, self).__init__(graph, source)
+        self.graph = graph
+        self._children = dict((node, set()) for node in self.pred)
+        for node, parent in self.pred.items():
+            if parent is not None:
+                self._children[parent].add(node)
+
+    def update_weight(self, u, v, weight):
+        """ Sets the weight of the edge u -> v (u <-> v in an undirected
+        Graph) and repairs the shortest paths. Returns the number of nodes
+        whose distance or path was changed. """
+        # graph.update_weight rejects a missing edge before anything changes
+        old = self.graph.adj[u].get(v) if u in self.graph.adj else None
+        self.graph.update_weight(u, v, weight)
+        arcs = [(u, v)]
+        if not isinstance(self.graph, DiGraph):
+            arcs.append((v, u))
+        repaired = 0
+        for a, b in arcs:
+            if weight < old:
+                repaired += self._decreased(a, b)
+            elif weight > old:
+                repaired += self._increased(a, b)
+        return repaired
+
+    def _set_parent(self, node, parent):
+        old = self.pred.get(node)
+        if old is not None:
+            self._children[old].discard(node)
+        self.pred[node] = parent
+        self._children.setdefault(node, set())
+        if parent is not None:
+            self._children[parent].add(node)
+
+    def _propagate(self, opened, within=None):
+        """ Dijkstra's algorithm from the nodes already in opened (whose
+        distances and parents are set), improving only nodes in within if
+        given. Returns the nodes settled. """
+        dist = self.dist
+        settled = set()
+        while opened:
+            x, d = opened.pop()
+            settled.add(x)
+            for y, weight in self.graph[x].items():
+                if within is not None and (y not in within or y in settled):
+                    continue
+                if y not in dist or d + weight < dist[y]:
+                    dist[y] = d + weight
+                    self._set_parent(y, x)
+                    opened.push(y, d + weight)
+        return settled
+
+    def _decreased(self, a, b):
+        """ Repairs after the arc a -> b got cheaper: it can only shorten
+        paths through it, so propagate outward from b. """
+        if a not in self.dist:
+            return 0
+        d = self.dist[a] + self.graph[a][b]
+        if b in self.dist and d >= self.dist[b]:
+            return 0
+        self.dist[b] = d
+        self._set_parent(b, a)
+        opened = utils.heap.IndexedHeap()
+        opened.push(b, d)
+        return len(self._propagate(opened))
+
+    def _increased(self, a, b):
+        """ Repairs after the arc a -> b got dearer: only if it is a tree
+        edge can any distance change, and then only within the subtree
+        under b. Those nodes are detached, each reseeded from its cheapest
+        predecessor outside the subtree, and resettled among themselves. """
+        if self.pred.get(b) != a:
+            return 0
+        subtree, stack = set(), [b]
+        while stack:
+            x = stack.pop()
+            subtree.add(x)
+            stack.extend(self._children[x])
+        incoming = getattr(self.graph, '_pred', self.graph._adj)
+        opened = utils.heap.IndexedHeap()
+        for x in subtree:
+            del self.dist[x]
+            self._set_parent(x, None)
+        for x in subtree:
+            best, parent = None, None
+            for p, weight in incoming[x].items():
+                if p in subtree or p not in self.dist:
                     continue
-            closed[neighbor] = new_cost
-            heapq.heappush(opened, (new_cost, neighbor, curr_node))
-    raise Exception('Node %s not reachable from %s' % (start, goal))
-                
+                if best is None or self.dist[p] + weight < best:
+                    best, parent = self.dist[p] + weight, p
+            if best is not None:
+                self.dist[x] = best
+                self._set_parent(x, parent)
+                opened.push(x, best)
+        # a -> b is still there, so every node of the subtree is reached
+        self._propagate(opened, subtree)
+        return len(subtree)
+
+# The graph of the ShortestPathIndex.build_many pool, in each worker
+_POOL_GRAPH = None
+
+def _set_pool_graph(graph):
+    global _POOL_GRAPH
+    _POOL_GRAPH = graph
+
+def _pool_index(source):
+    return ShortestPathIndex(_POOL_GRAPH, source)
+
+# Distance recorded by multi_source_dijkstra_parallel for unreachable nodes
+UNREACHABLE = -1
+
+def _fill_distances(graph, source_id, out, start):
+    """ Runs Dijkstra's algorithm over CSR-shaped graph from source_id and
+    writes the distance to every node id into out[start:start+n]. """
+    _, dist, _, _ = _csr_search(graph, {source_id: 0})
+    for i, d in enumerate(dist):
+        out[start + i] = UNREACHABLE if d is None else d
+
+class _SharedCSR(object):
+    """ The arrays of a CSRGraph, attached from shared memory in a worker;
+    enough of a CSRGraph for _csr_search. """
+    def __init__(self, n, offsets, targets, weights):
+        self.nodes = range(n)
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+# The worker's shared memory blocks, graph and output table
+_SHARED = None
+
+def _attach_shared(layout, n):
+    from multiprocessing import shared_memory
+    global _SHARED
+    blocks, views = [], []
+    for name, typecode, length in layout:
+        block = shared_memory.SharedMemory(name=name)
+        itemsize = array.array(typecode).itemsize
+        blocks.append(block)
+        views.append(block.buf[:length*itemsize].cast(typecode))
+    _SHARED = (blocks, _SharedCSR(n, *views[:3]), views[3])
+
+def _shared_search(job):
+    k, source_id = job
+    _, graph, out = _SHARED
+    _fill_distances(graph, source_id, out, k*len(graph.nodes))
+
+def multi_source_dijkstra_parallel(graph, sources, workers=None):
+    """ Runs a separate single-source Dijkstra search from each of sources,
+    spread over up to workers processes (default: the number of CPUs).
+    Returns a dict mapping each source to an array of its distances to every
+    node, indexed by node id (the node's position in graph.nodes), with
+    UNREACHABLE for nodes it cannot reach.
+
+    graph should be a CSRGraph; a Graph or DiGraph is converted first. Its
+    arrays are copied once into multiprocessing.shared_memory, which the
+    workers attach to by name, so no adjacency dicts are ever pickled, and
+    the workers write their distances straight into a shared table.
+
+    >>> g = DiGraph()
+    >>> for u, v, w in [('a', 'b', 1), ('b', 'c', 1), ('a', 'c', 5)]:
+    ...     g.add_edge(u, v, w)
+    >>> csr = CSRGraph.from_graph(g)
+    >>> dist = multi_source_dijkstra_parallel(csr, ['a', 'c'], workers=1)
+    >>> [(node, dist['a'][i], dist['c'][i]) for i, node in enumerate(csr)]
+    [('a', 0, -1), ('b', 1, -1), ('c', 2, 0)]
+    """
+    import os
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_graph(graph)
+    sources = list(sources)
+    n = len(graph.nodes)
+    typecode = graph.weights.typecode
+    jobs = [(k, graph.index[source]) for k, source in enumerate(sources)]
+    workers = min(workers or os.cpu_count() or 1, len(sources))
+    if workers <= 1:
+        out = array.array(typecode, [0]) * (len(sources)*n)
+        for k, source_id in jobs:
+            _fill_distances(graph, source_id, out, k*n)
+        return dict((source, out[k*n:(k+1)*n])
+                    for k, source in enumerate(sources))
+
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+    tables = [graph.offsets, graph.targets, graph.weights,
+              array.array(typecode, [0]) * (len(sources)*n)]
+    blocks, layout = [], []
+    try:
+        for table in tables:
+            size = len(table) * table.itemsize
+            block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            blocks.append(block)
+            block.buf[:size] = memoryview(table).cast('B')
+            layout.append((block.name, table.typecode, len(table)))
+        with ProcessPoolExecutor(workers, initializer=_attach_shared,
+                                 initargs=(layout, n)) as pool:
+            chunksize = max(1, len(jobs) // (4*workers))
+            list(pool.map(_shared_search, jobs, chunksize=chunksize))
+        out = blocks[-1].buf[:len(tables[-1])*tables[-1].itemsize]
+        table = out.cast(typecode)
+        try:
+            return dict((source, array.array(typecode, table[k*n:(k+1)*n]))
+                        for k, source in enumerate(sources))
+        finally:
+            table.release()
+            out.release()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+class AdjacencyView(object):
+    """ Read-only mapping of node -> read-only mapping of its neighbors to
+    edge weights, over a graph's adjacency dicts. See Graph.adj. """
+    __slots__ = ('_adj',)
+
+    def __init__(self, adj):
+        self._adj = adj
+
+    def __getitem__(self, n):
+        return types.MappingProxyType(self._adj[n])
+
+    def __iter__(self):
+        return iter(self._adj)
+
+    def __len__(self):
+        return len(self._adj)
+
+    def __contains__(self, n):
+        return n in self._adj
+
+    def items(self):
+        for node, neighbors in self._adj.items():
+            yield node, types.MappingProxyType(neighbors)
+
+
+class EdgeView(object):
+    """ Live view of the edges of a graph. See Graph.edge_view. """
+    __slots__ = ('_graph', '_weights')
+
+    def __init__(self, graph, weights=False):
+        self._graph = graph
+        self._weights = weights
+
+    def __iter__(self):
+        return self._graph._iter_edges(self._weights)
+
+    def __len__(self):
+        return self._graph._num_edges
+
+    def __contains__(self, edge):
+        u, v = edge[0], edge[1]
+        return v in self._graph._adj.get(u, ())
+
+
 class Graph(object):
     """ Base class for undirected graph.
 
     Allows any hashable object as node. Can add weight to each edge. """
+    __slots__ = ('_adj', '_nodes', '_node_ids', '_num_edges')
+
     def __init__(self):
         self._adj = dict() # Adjacency dict
         self._nodes = set() # Node set
+        self._node_ids = dict() # Node -> number, in order of addition
+        self._num_edges = 0
+
+    @classmethod
+    def from_edges(cls, edges, weights=False):
+        """ Builds a graph from an iterable of (u, v) edges, or of (u, v,
+        weight) edges if weights is true (the form edges(weights=True)
+        yields). Much faster than add_edge for each edge, as nothing is
+        checked per edge.
+
+        >>> g = Graph.from_edges([(1, 2, 5), (2, 3, 7)], weights=True)
+        >>> g[2] == {1: 5, 3: 7}
+        True
+        """
+        graph = cls()
+        if not weights:
+            edges = ((u, v, None) for u, v in edges)
+        graph._add_edges(edges)
+        graph._index_nodes()
+        return graph
+
+    @classmethod
+    def from_adjacency(cls, adjacency):
+        """ Builds a graph from a dict mapping each node to its neighbors,
+        either a dict of neighbor -> weight or an iterable of neighbors
+        (giving unweighted edges). Neighbors need not be keys themselves.
+
+        >>> g = DiGraph.from_adjacency({'a': {'b': 1, 'c': 2}, 'b': ['c']})
+        >>> sorted(g), g['a'] == {'b': 1, 'c': 2}, g['b']
+        (['a', 'b', 'c'], True, {'c': None})
+        """
+        def edges():
+            for u, neighbors in adjacency.items():
+                if isinstance(neighbors, dict):
+                    for v, weight in neighbors.items():
+                        yield u, v, weight
+                else:
+                    for v in neighbors:
+                        yield u, v, None
+        graph = cls()
+        graph._add_edges(edges())
+        for node in adjacency:
+            graph._ensure_node(node)
+        graph._index_nodes()
+        return graph
+
+    def _index_nodes(self):
+        """ Brings _nodes, _node_ids and _num_edges up to date with the
+        adjacency dicts, after a bulk build. """
+        self._nodes = set(self._adj)
+        self._node_ids = dict((node, i) for i, node in enumerate(self._adj))
+        self._num_edges = self._count_edges()
+
+    def _count_edges(self):
+        # Each edge is in two neighbor dicts, except for self-loops
+        loops = sum(1 for node, neighbors in self._adj.items()
+                    if node in neighbors)
+        return (sum(len(neighbors) for neighbors in self._adj.values())
+                + loops) // 2
+
+    def _ensure_node(self, node):
+        if node not in self._adj:
+            self._adj[node] = {}
+
+    def _add_edges(self, edges):
+        """ Adds (u, v, weight) edges straight into the adjacency dict,
+        without touching _nodes. """
+        adj = self._adj
+        for u, v, weight in edges:
+            try:
+                adj[u][v] = weight
+            except KeyError:
+                adj[u] = {v: weight}
+            try:
+                adj[v][u] = weight
+            except KeyError:
+                adj[v] = {u: weight}
 
     def __iter__(self):
         """ Iterator over the nodes of graph. """
@@ -60,8 +706,9 @@ class Graph(object):
 
     def add_node(self, node):
         if node in self._nodes:
-            raise Exception('Node %s already exists in graph!' % n)
+            raise Exception('Node %s already exists in graph!' % node)
         self._nodes.add(node)
+        self._node_ids[node] = len(self._node_ids)
         self._adj[node] = {}
 
     def add_nodes(self, nodes):
@@ -74,25 +721,52 @@ class Graph(object):
             self.add_node(u)
         if v not in self._nodes:
             self.add_node(v)
+        if v not in self._adj[u]:
+            self._num_edges += 1
+        self._adj[u][v] = weight
+        self._adj[v][u] = weight
+
+    def update_weight(self, u, v, weight):
+        """ Sets the weight of the existing edge u <-> v. """
+        if v not in self._adj.get(u, ()):
+            raise Exception('No edge %s <-> %s in graph!' % (u, v))
         self._adj[u][v] = weight
         self._adj[v][u] = weight
 
+    @property
+    def adj(self):
+        """ Read-only view of the adjacency: g.adj[n] is a live, read-only
+        mapping of the neighbors of n to edge weights. Nothing is copied. """
+        return AdjacencyView(self._adj)
+
+    @property
+    def num_edges(self):
+        return self._num_edges
+
     def neighbors(self, n):
         """ Returns list of neighbors of node n. """
         return list(self._adj[n])
 
-    def edges(self, weights=False):
-        """ Returns iterator for edges. """
-        seen = {}
-        for node, neighbors in self._adj.iteritems():
-            for neighbor, weight in neighbors.iteritems():
-                if  neighbor not in seen:
+    def edge_view(self, weights=False):
+        """ Returns a live view of the edges: iterable (as (u, v), or
+        (u, v, weight) tuples if weights), with an O(1) len(). """
+        return EdgeView(self, weights)
+
+    def _iter_edges(self, weights):
+        # Yield each undirected edge once, from its earlier-added end
+        ids = self._node_ids
+        for node, neighbors in self._adj.items():
+            node_id = ids[node]
+            for neighbor, weight in neighbors.items():
+                if node_id <= ids[neighbor]:
                     if weights:
                         yield (node, neighbor, weight)
                     else:
                         yield (node, neighbor)
-            seen[node] = 1
-        del seen
+
+    def edges(self, weights=False):
+        """ Returns iterator for edges. """
+        return self._iter_edges(weights)
 
     def edge_list(self, weights=False):
         return list(self.edges(weights))
@@ -102,12 +776,42 @@ class DiGraph(Graph):
     """ Base class for directed graph.
 
     Allows any hashable object as node. Can add weight to each edge. """
+    __slots__ = ('_pred', '_succ')
+
     def __init__(self):
         self._nodes = set() # Node set
+        self._node_ids = dict() # Node -> number, in order of addition
+        self._num_edges = 0
         self._pred = dict() # Predecessor dict
         self._succ = dict()# Successor dict
         self._adj = self._succ # Successor = adjacency dict
 
+    def _count_edges(self):
+        return sum(len(successors) for successors in self._succ.values())
+
+    def _ensure_node(self, node):
+        if node not in self._succ:
+            self._succ[node] = {}
+            self._pred[node] = {}
+
+    def _add_edges(self, edges):
+        """ Adds (u, v, weight) edges straight into the successor and
+        predecessor dicts, without touching _nodes. """
+        succ, pred = self._succ, self._pred
+        for u, v, weight in edges:
+            try:
+                succ[u][v] = weight
+            except KeyError:
+                succ[u] = {v: weight}
+                if u not in pred:
+                    pred[u] = {}
+            try:
+                pred[v][u] = weight
+            except KeyError:
+                pred[v] = {u: weight}
+                if v not in succ:
+                    succ[v] = {}
+
     def add_node(self, node):
         super(DiGraph, self).add_node(node)
         self._pred[node] = {}
@@ -118,6 +822,15 @@ class DiGraph(Graph):
             self.add_node(u)
         if v not in self._nodes:
             self.add_node(v)
+        if v not in self._succ[u]:
+            self._num_edges += 1
+        self._succ[u][v] = weight
+        self._pred[v][u] = weight
+
+    def update_weight(self, u, v, weight):
+        """ Sets the weight of the existing edge u -> v. """
+        if v not in self._succ.get(u, ()):
+            raise Exception('No edge %s -> %s in graph!' % (u, v))
         self._succ[u][v] = weight
         self._pred[v][u] = weight
 
@@ -127,9 +840,83 @@ class DiGraph(Graph):
     def predecessors(self, n):
         return iter(self._pred[n])
 
-    def edges(self, weights=False):
-        """ Returns iterator for edges. """
-        for node, neighbors in self._adj.iteritems():
-            for neighbor, weight in neighbors.iteritems():
+    def _iter_edges(self, weights):
+        for node, neighbors in self._succ.items():
+            for neighbor, weight in neighbors.items():
                 if weights: yield (node, neighbor, weight)
                 else:       yield (node, neighbor)
+
+
+class CSRGraph(object):
+    """ Compact, immutable directed graph in compressed sparse row form.
+
+    Nodes are numbered 0..n-1 (in the order of self.nodes). The out-edges of
+    node i are edges offsets[i] to offsets[i+1]-1; edge k goes to node
+    targets[k] with weight weights[k]. All three are flat arrays, so a graph
+    costs a few machine words per edge rather than a dict entry per edge.
+
+    Build one from a Graph or DiGraph with CSRGraph.from_graph. An undirected
+    Graph becomes a CSRGraph with an edge in each direction. Unweighted edges
+    get weight 1.
+
+    >>> g = DiGraph()
+    >>> g.add_edge('a', 'b', 2); g.add_edge('b', 'c', 3)
+    >>> csr = CSRGraph.from_graph(g)
+    >>> csr['a'], csr.neighbors('b'), len(csr), csr.num_edges
+    ({'b': 2}, ['c'], 3, 2)
+    """
+
+    __slots__ = ('nodes', 'index', 'offsets', 'targets', 'weights')
+
+    def __init__(self, nodes, offsets, targets, weights):
+        self.nodes = list(nodes)
+        self.index = dict((node, i) for i, node in enumerate(self.nodes))
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_graph(cls, graph):
+        nodes = list(graph._adj)
+        index = dict((node, i) for i, node in enumerate(nodes))
+        weights = []
+        targets = array.array('i' if len(nodes) < 2**31 else 'q')
+        offsets = array.array('q', [0])
+        for node in nodes:
+            for neighbor, weight in graph._adj[node].items():
+                targets.append(index[neighbor])
+                weights.append(1 if weight is None else weight)
+            offsets.append(len(targets))
+        if all(isinstance(w, int) for w in weights):
+            weights = array.array('q', weights)
+        else:
+            weights = array.array('d', weights)
+        return cls(nodes, offsets, targets, weights)
+
+    def __iter__(self):
+        """ Iterator over the nodes of graph. """
+        return iter(self.nodes)
+
+    def __len__(self):
+        """ Returns number of nodes """
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def __getitem__(self, n):
+        """ Returns a dict of successors of node n and their edge weights. """
+        i = self.index[n]
+        lo, hi = self.offsets[i], self.offsets[i+1]
+        return dict((self.nodes[self.targets[k]], self.weights[k])
+                    for k in range(lo, hi))
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def neighbors(self, n):
+        """ Returns list of successors of node n. """
+        i = self.index[n]
+        return [self.nodes[self.targets[k]]
+                for k in range(self.offsets[i], self.offsets[i+1])]
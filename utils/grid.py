@@ -0,0 +1,183 @@
+""" Shortest paths on a matrix of cell weights, without building a graph.
+
+A path's cost is the sum of the weights of every cell it visits, including
+the first and the last. Which steps are allowed is given by a move set, a
+tuple of (row step, column step) pairs; the usual ones are defined here.
+Neighbours are computed on the fly, so no edges are ever materialised.
+"""
+import heapq
+
+import utils.io
+
+# Move sets, as (row step, column step) pairs
+RIGHT_DOWN = ((0, 1), (1, 0))
+UP_DOWN_RIGHT = ((-1, 0), (1, 0), (0, 1))
+ALL_FOUR = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def _flatten(matrix):
+    """ Returns (cells, rows, cols), with cells the weights of matrix (a
+    list of rows, or a utils.io.IntMatrix) in a flat row-major sequence. """
+    if isinstance(matrix, utils.io.IntMatrix):
+        return matrix.data, matrix.rows, matrix.cols
+    rows, cols = len(matrix), len(matrix[0])
+    cells = [w for row in matrix for w in row]
+    if len(cells) != rows*cols:
+        raise ValueError('Matrix rows must all have the same length')
+    return cells, rows, cols
+
+
+def cell_edges(matrix, moves=ALL_FOUR):
+    """ Yields the (u, v, weight) edges of the graph of matrix (a list of
+    rows, or an IntMatrix) under moves: an edge from each (row, col) cell u
+    to each cell v one move away, weighted by the weight of v. Feed them to
+    utils.graph.DiGraph.from_edges(..., weights=True).
+
+    >>> for edge in cell_edges([[1, 2], [3, 4]], RIGHT_DOWN):
+    ...     print(edge)
+    ((0, 0), (0, 1), 2)
+    ((1, 0), (1, 1), 4)
+    ((0, 0), (1, 0), 3)
+    ((0, 1), (1, 1), 4)
+    """
+    cells, rows, cols = _flatten(matrix)
+    # One tuple per cell, shared by all of its edges
+    nodes = [(r, c) for r in range(rows) for c in range(cols)]
+    for dr, dc in moves:
+        step = dr*cols + dc
+        for r in range(max(0, -dr), min(rows, rows - dr)):
+            base = r*cols
+            for u in range(base + max(0, -dc), base + min(cols, cols - dc)):
+                yield nodes[u], nodes[u + step], cells[u + step]
+
+
+def min_path_cost(matrix, sources=None, targets=None, moves=ALL_FOUR):
+    """ Returns the minimal cost of a path through matrix (a list of rows, or
+    an IntMatrix) which starts at any of the (row, col) cells in sources,
+    ends at any of the cells in targets, and only takes steps in moves.
+    Sources default to the top-left cell and targets to the bottom-right
+    cell.
+
+    Runs Dijkstra's algorithm over the cells, stopping as soon as the first
+    target is reached.
+
+    >>> m = [[1, 9, 1],
+    ...      [1, 9, 1],
+    ...      [1, 1, 1]]
+    >>> min_path_cost(m, moves=RIGHT_DOWN)
+    5
+    >>> min_path_cost(m, [(0, 0)], [(0, 2)], moves=ALL_FOUR)
+    7
+    >>> min_path_cost(m, [(r, 0) for r in range(3)],
+    ...               [(r, 2) for r in range(3)], moves=UP_DOWN_RIGHT)
+    3
+    """
+    cells, rows, cols = _flatten(matrix)
+    if sources is None:
+        sources = [(0, 0)]
+    if targets is None:
+        targets = [(rows-1, cols-1)]
+    goal = set(r*cols + c for r, c in targets)
+    dist = [None] * (rows*cols)
+    opened = []
+    for r, c in sources:
+        u = r*cols + c
+        if dist[u] is None or cells[u] < dist[u]:
+            dist[u] = cells[u]
+            opened.append((cells[u], u))
+    heapq.heapify(opened)
+    done = bytearray(rows*cols)
+    while opened:
+        d, u = heapq.heappop(opened)
+        if done[u]:
+            continue
+        if u in goal:
+            return d
+        done[u] = 1
+        r, c = divmod(u, cols)
+        for dr, dc in moves:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                v = nr*cols + nc
+                new_cost = d + cells[v]
+                if dist[v] is None or new_cost < dist[v]:
+                    dist[v] = new_cost
+                    heapq.heappush(opened, (new_cost, v))
+    raise ValueError('No target reachable from the sources')
+
+
+def _right_down_sums(rows):
+    """ min_path_sum for RIGHT_DOWN: best[c] is the cheapest path from the
+    top-left cell to column c of the current row. """
+    best = None
+    for row in rows:
+        if best is None:
+            best, total = [], 0
+            for w in row:
+                total += w
+                best.append(total)
+            continue
+        if len(row) != len(best):
+            raise ValueError('Matrix rows must all have the same length')
+        left = best[0] = best[0] + row[0]
+        for c in range(1, len(best)):
+            above = best[c]
+            left = best[c] = row[c] + (above if above < left else left)
+    if best is None:
+        raise ValueError('Empty matrix')
+    return best[-1]
+
+
+def _up_down_right_sums(columns):
+    """ min_path_sum for UP_DOWN_RIGHT, a column at a time: best[r] is the
+    cheapest path from any cell of the first column to row r of the current
+    column. Entering a column from the left, then relaxing downward and
+    upward, covers every way of moving within it. """
+    best = None
+    for col in columns:
+        if best is None:
+            best = list(col)
+            continue
+        n = len(best)
+        if len(col) != n:
+            raise ValueError('Matrix columns must all have the same length')
+        for r in range(n):
+            best[r] += col[r]
+        for r in range(1, n):
+            down = best[r-1] + col[r]
+            if down < best[r]:
+                best[r] = down
+        for r in range(n-2, -1, -1):
+            up = best[r+1] + col[r]
+            if up < best[r]:
+                best[r] = up
+    if best is None:
+        raise ValueError('Empty matrix')
+    return min(best)
+
+
+def min_path_sum(lines, moves=RIGHT_DOWN):
+    """ Returns the minimal cost of a path through a matrix given one line
+    at a time, by dynamic programming over a single working vector, so only
+    the current line and that vector are ever held in memory.
+
+    With RIGHT_DOWN, lines are the rows of the matrix, and paths run from
+    the top-left cell to the bottom-right cell. With UP_DOWN_RIGHT, lines
+    are the columns, and paths run from any cell of the first column to any
+    cell of the last. Paths that can move left (ALL_FOUR) have no such
+    single-sweep solution; use min_path_cost for those.
+
+    >>> m = [[1, 9, 1],
+    ...      [1, 9, 1],
+    ...      [1, 1, 1]]
+    >>> min_path_sum(iter(m))
+    5
+    >>> min_path_sum(zip(*m), moves=UP_DOWN_RIGHT)
+    3
+    """
+    if moves == RIGHT_DOWN:
+        return _right_down_sums(lines)
+    if moves == UP_DOWN_RIGHT:
+        return _up_down_right_sums(lines)
+    raise ValueError('min_path_sum only supports the RIGHT_DOWN and '
+                     'UP_DOWN_RIGHT move sets, not %s' % (moves,))
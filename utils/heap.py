@@ -0,0 +1,117 @@
+""" An indexed binary min-heap, the priority queue behind the graph searches.
+
+Unlike a heapq list, an IndexedHeap holds each item at most once and knows
+where it is, so an item's priority can be lowered in place (decrease-key)
+instead of pushing a duplicate entry and skipping it later. The heap never
+grows beyond the number of distinct items, and only priorities are ever
+compared, so items need only be hashable: 'START' and (r, c) can share a
+heap.
+"""
+
+
+class IndexedHeap(object):
+    """ Min-heap of hashable items keyed by priority, with decrease-key.
+
+    >>> h = IndexedHeap()
+    >>> h.push('a', 5)
+    True
+    >>> h.push((0, 1), 3)
+    True
+    >>> h.push('a', 1) # Lowers 'a' from 5 to 1
+    True
+    >>> h.push((0, 1), 4) # Not lower, so ignored
+    False
+    >>> len(h), h.peek()
+    (2, ('a', 1))
+    >>> h.pop(), h.pop()
+    (('a', 1), ((0, 1), 3))
+    """
+
+    def __init__(self):
+        self._items = [] # Heap ordered
+        self._priorities = [] # Parallel to _items
+        self._position = {} # Item -> its index in _items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+    __nonzero__ = __bool__
+
+    def __contains__(self, item):
+        return item in self._position
+
+    def priority(self, item):
+        """ Returns the priority of item, which must be in the heap. """
+        return self._priorities[self._position[item]]
+
+    def push(self, item, priority):
+        """ Adds item with priority, or lowers its priority if it is already
+        in the heap with a higher one. Returns whether the heap changed. """
+        i = self._position.get(item)
+        if i is None:
+            i = len(self._items)
+            self._items.append(item)
+            self._priorities.append(priority)
+            self._position[item] = i
+        elif priority < self._priorities[i]:
+            self._priorities[i] = priority
+        else:
+            return False
+        self._sift_up(i)
+        return True
+
+    def peek(self):
+        """ Returns (item, priority) for the lowest priority, leaving it in
+        the heap. """
+        if not self._items:
+            raise IndexError('peek at an empty heap')
+        return self._items[0], self._priorities[0]
+
+    def pop(self):
+        """ Removes and returns (item, priority) for the lowest priority. """
+        items, priorities = self._items, self._priorities
+        if not items:
+            raise IndexError('pop from an empty heap')
+        item, priority = items[0], priorities[0]
+        del self._position[item]
+        last_item, last_priority = items.pop(), priorities.pop()
+        if items:
+            items[0], priorities[0] = last_item, last_priority
+            self._position[last_item] = 0
+            self._sift_down(0)
+        return item, priority
+
+    def _sift_up(self, i):
+        items, priorities = self._items, self._priorities
+        position = self._position
+        item, priority = items[i], priorities[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not priority < priorities[parent]:
+                break
+            items[i], priorities[i] = items[parent], priorities[parent]
+            position[items[i]] = i
+            i = parent
+        items[i], priorities[i] = item, priority
+        position[item] = i
+
+    def _sift_down(self, i):
+        items, priorities = self._items, self._priorities
+        position = self._position
+        n = len(items)
+        item, priority = items[i], priorities[i]
+        while True:
+            child = 2*i + 1
+            if child >= n:
+                break
+            if child+1 < n and priorities[child+1] < priorities[child]:
+                child += 1
+            if not priorities[child] < priority:
+                break
+            items[i], priorities[i] = items[child], priorities[child]
+            position[items[i]] = i
+            i = child
+        items[i], priorities[i] = item, priority
+        position[item] = i
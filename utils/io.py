@@ -0,0 +1,144 @@
+""" Loading integer matrices, such as the matrix.txt files of p81-p83.
+
+Text matrices are line separated rows of comma-separated integers. They are
+parsed a row at a time straight into a flat array('q'), never into a list
+of lists of boxed ints, and can also be streamed row by row for algorithms
+that only need one row at a time.
+
+A matrix can be converted once to a binary form (save_int_matrix), which
+load_int_matrix then memory-maps instead of parsing: a 24 byte header of
+the magic MAGIC and the row and column counts (native 8 byte ints),
+followed by the cells in row-major order as native 8 byte ints.
+"""
+import array
+import mmap
+import os
+
+MAGIC = b'EULERMAT'
+_HEADER = array.array('q', [0, 0]).itemsize * 2 + len(MAGIC)
+
+
+class IntMatrix(object):
+    """ A rows by cols matrix of ints stored flat, row-major, in data (an
+    array('q') or a memoryview of format 'q'). m[r] is row r and m[r, c]
+    (or m[r][c]) the cell at row r, column c. Rows and columns are
+    memoryviews onto data, so nothing is copied.
+
+    >>> m = IntMatrix(array.array('q', range(6)), 3)
+    >>> len(m), m.rows, m.cols
+    (2, 2, 3)
+    >>> m[1, 2], m[1][2], list(m.row(1))
+    (5, 5, [3, 4, 5])
+    >>> [list(col) for col in m.columns()]
+    [[0, 3], [1, 4], [2, 5]]
+    """
+
+    def __init__(self, data, cols):
+        if cols <= 0 or len(data) % cols:
+            raise ValueError('%d cells do not make rows of %d'
+                             % (len(data), cols))
+        self.data = data
+        self.cols = cols
+        self.rows = len(data) // cols
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            r, c = index
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                raise IndexError('cell %s out of range' % (index,))
+            return self.data[r*self.cols + c]
+        return self.row(index)
+
+    def __iter__(self):
+        for r in range(self.rows):
+            yield self.row(r)
+
+    def row(self, r):
+        if r < 0:
+            r += self.rows
+        if not 0 <= r < self.rows:
+            raise IndexError('row %d out of range' % r)
+        return memoryview(self.data)[r*self.cols:(r+1)*self.cols]
+
+    def column(self, c):
+        if not 0 <= c < self.cols:
+            raise IndexError('column %d out of range' % c)
+        return memoryview(self.data)[c::self.cols]
+
+    def columns(self):
+        for c in range(self.cols):
+            yield self.column(c)
+
+    def tolist(self):
+        return [list(row) for row in self]
+
+
+def _is_binary(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _parse_row(line):
+    return array.array('q', map(int, line.split(',')))
+
+
+def _load_binary(path):
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER)
+        rows, cols = array.array('q', header[len(MAGIC):])
+        if os.fstat(f.fileno()).st_size != _HEADER + 8*rows*cols:
+            raise ValueError('%s is truncated' % path)
+        if rows*cols == 0:
+            return IntMatrix(array.array('q'), max(cols, 1))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return IntMatrix(memoryview(mapped)[_HEADER:].cast('q'), cols)
+
+
+def iter_int_rows(path):
+    """ Yields the rows of the matrix in path, text or binary, one at a time
+    as array('q')s (or memoryviews, for a binary file), holding only the
+    current row in memory. """
+    if _is_binary(path):
+        for row in _load_binary(path):
+            yield row
+        return
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield _parse_row(line)
+
+
+def load_int_matrix(path):
+    """ Returns the matrix in path as an IntMatrix. A binary file written by
+    save_int_matrix is memory-mapped read-only rather than read; a text file
+    is parsed row by row into a flat array('q'). """
+    if _is_binary(path):
+        return _load_binary(path)
+    data = array.array('q')
+    cols = None
+    for row in iter_int_rows(path):
+        if cols is None:
+            cols = len(row)
+        elif len(row) != cols:
+            raise ValueError('Matrix rows must all have the same length')
+        data.extend(row)
+    if cols is None:
+        raise ValueError('%s holds no matrix' % path)
+    return IntMatrix(data, cols)
+
+
+def save_int_matrix(matrix, path):
+    """ Writes matrix (an IntMatrix, or a list of rows) to path in the binary
+    form, for load_int_matrix to memory-map. """
+    if not isinstance(matrix, IntMatrix):
+        data = array.array('q')
+        for row in matrix:
+            data.extend(row)
+        matrix = IntMatrix(data, len(matrix[0]))
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(array.array('q', [matrix.rows, matrix.cols]).tobytes())
+        f.write(memoryview(matrix.data).cast('B'))
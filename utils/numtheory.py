@@ -1,131 +1,310 @@
+import array
 import itertools
 import math
 import bisect
 import collections
 import utils.contfrac
+import utils.diskcache
 import utils
 
+# Number of odd candidates sieved per segment. One flag byte per odd number,
+# so a segment of this size sits comfortably in L2 cache.
+_SIEVE_SEGMENT = 1 << 18
+
+def _sieve_segment(lo, n, base_primes):
+    """ Sieves the n odd numbers lo, lo+2, ..., lo+2*(n-1) (lo odd) with the
+    odd primes in base_primes. Returns a bytearray of flags, where flags[i] is
+    1 iff lo+2*i has no factor among base_primes (or is one of them). """
+    flags = bytearray(b'\x01') * n
+    hi = lo + 2*n
+    for p in base_primes:
+        sq = p*p
+        if sq >= hi: break
+        if sq >= lo:
+            start = sq
+        else:
+            # First odd multiple of p which is >= lo
+            start = -(-lo // p) * p
+            if not start & 1: start += p
+        i = (start - lo) // 2
+        flags[i::p] = bytes((n - 1 - i) // p + 1)
+    return flags
+
+def _small_primes(n):
+    """ Returns a list of all primes <= n, using a plain (non-segmented)
+    odd-only bytearray sieve. Intended for the base primes of the segmented
+    sieve, so n is expected to be small.
+
+    >>> _small_primes(30)
+    [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    """
+    if n < 2: return []
+    size = (n - 1) // 2 # odd numbers 3, 5, ..., <= n
+    flags = bytearray(b'\x01') * size
+    for i in range((math.isqrt(n) - 1) // 2):
+        if flags[i]:
+            p = 2*i + 3
+            j = (p*p - 3) // 2
+            flags[j::p] = bytes((size - 1 - j) // p + 1)
+    return [2] + list(itertools.compress(range(3, n+1, 2), flags))
+
+def _segmented_primes(minimum=2, maximum=None):
+    """ Yields the primes p with minimum <= p <= maximum in order, sieving
+    _SIEVE_SEGMENT odd numbers at a time. A maximum of None never stops.
+
+    The base primes needed to sieve a segment are recomputed (doubling their
+    bound) only when the segments outgrow them. """
+    if maximum is not None and maximum < minimum: return
+    if minimum <= 2 and (maximum is None or maximum >= 2):
+        yield 2
+    lo = max(3, minimum | 1)
+    base, base_limit = [], 0
+    while maximum is None or lo <= maximum:
+        n = _SIEVE_SEGMENT
+        if maximum is not None:
+            n = min(n, (maximum - lo) // 2 + 1)
+        hi = lo + 2*n
+        if base_limit*base_limit < hi:
+            base_limit = max(2*base_limit, math.isqrt(hi) + 1)
+            base = _small_primes(base_limit)[1:]
+        flags = _sieve_segment(lo, n, base)
+        for p in itertools.compress(range(lo, hi, 2), flags):
+            yield p
+        lo = hi
+
+def primes_in_range(a, b):
+    """ Returns a list of all primes in the range [a, b], sieving only that
+    range (in segments) rather than everything below b.
+
+    >>> primes_in_range(2, 30)
+    [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    >>> primes_in_range(1000, 1050)
+    [1009, 1013, 1019, 1021, 1031, 1033, 1039, 1049]
+    """
+    return list(_segmented_primes(max(2, int(math.ceil(a))), int(b)))
+
 def soe():
     """ Generator version of the Sieve of Eratosthenes.
 
-    Optimization does not record a prime's info in the dict until
-    its square is seen among the candidates. This brings the space
-    complexity below O(sqrt(n)) instead of O(n), for n primes produced.
-
-    Created by Will Ness (http://stackoverflow.com/a/10733621)
-    See also http://www.haskell.org/haskellwiki/Prime_numbers#From_Squares """
-    #def add(D, x, s):
-    #    while x in D: x+= s
-    #    D[x] = s
-    yield 2; yield 3; yield 5; yield 7
-    D = {}
-    ps = (p for p in soe())
-    p = next(ps) and next(ps)
-    q = p*p
-    for c in itertools.islice(itertools.count(9), 0, None, 2):
-        if c not in D:
-            if c < q: yield c
-            else:
-                x, s = c+2*p, 2*p
-                while x in D: x += s
-                D[x] = s
-                p = next(ps)
-                q = p*p
-        else:
-            s = D.pop(c)
-            x = c+s
-            while x in D: x += s
-            D[x] = s
+    Yields the primes in order, forever. Backed by a segmented, odd-only
+    bytearray sieve, so memory use is one cache-sized segment plus the
+    primes below the square root of the current segment. """
+    return _segmented_primes()
 
 def bounded_soe(maximum=None, minimum=2):
     """ Generator version of the Sieve of Eartosthenes which starts above
     minimum and terminates when all primes below maximum are enumerated.
 
     A value of None for maximum corresponds to infinity, conceptually, as
-    the upper bound. """
+    the upper bound.
+
+    With utils.diskcache enabled, a bounded range is served from the shared
+    PrimeTable, which is memory-mapped from disk if an earlier run built it,
+    rather than sieved afresh. """
+    # The bounds may be floats (e.g. a square root); the sieve needs ints
+    minimum = max(2, int(math.ceil(minimum)))
     if not maximum:
-        for p in soe():
-            if p >= minimum: yield p
-    else:
-        assert maximum > minimum
-        ps = (p for p in soe())
-        p = next(ps)
-        while p <= maximum:
-            if p >= minimum: yield p
-            p = next(ps)
+        return _segmented_primes(minimum)
+    assert maximum > minimum
+    if utils.diskcache.enabled():
+        return iter(_prime_table().between(minimum, int(maximum)))
+    return _segmented_primes(minimum, int(maximum))
 
 
 def allprimes():
     """ Generates all the prime numbers in sequence. Generator version of the
     Sieve of Eratosthenes.
 
-    Optimization does not record a prime's info in the dict until
-    its square is seen among the candidates. This brings the space
-    complexity below O(sqrt(n)) instead of O(n), for n primes produced.
-
-    Created by Will Ness (http://stackoverflow.com/a/10733621)
-    See also http://www.haskell.org/haskellwiki/Prime_numbers#From_Squares """
-    yield 2; yield 3; yield 5; yield 7
-    D = {}
-    ps = (p for p in allprimes())
-    p = next(ps) and next(ps)
-    q = p*p
-    for c in itertools.islice(itertools.count(9), 0, None, 2):
-        if c not in D:
-            if c < q: yield c
-            else:
-                x, s = c+2*p, 2*p
-                while x in D: x += s
-                D[x] = s
-                p = next(ps)
-                q = p*p
-        else:
-            s = D.pop(c)
-            x = c+s
-            while x in D: x += s
-            D[x] = s
-
-# Number of primes to add to _PRIMELIST_CACHE when we add more
-_PRIMELIST_INCREMENT = 1000
-_PRIMELIST_GEN = allprimes()
-_PRIMELIST_CACHE = [next(_PRIMELIST_GEN) for i in range(_PRIMELIST_INCREMENT)]
-
-def _extend_primelist_if_needed(b):
-    """ Extends _PRIMELIST_CACHE to ensure we have primes up to b """
-    while _PRIMELIST_CACHE[-1] < b:
-        _PRIMELIST_CACHE.extend(next(_PRIMELIST_GEN)for i in
-                                range(_PRIMELIST_INCREMENT))
+    Equivalent to soe(); see _segmented_primes for the sieve itself. """
+    return _segmented_primes()
+
+def _prime_typecode(maximum):
+    """ Smallest unsigned array typecode that can hold values <= maximum. """
+    if maximum < 1 << (8*array.array('I').itemsize):
+        return 'I'
+    return 'Q'
+
+
+class PrimeTable(object):
+    """ A table of every prime up to some limit, stored unboxed in an array.
+
+    The table grows geometrically: asking for primes beyond the current limit
+    sieves (at least) as many new numbers as are already covered, one segment
+    at a time, and appends the new primes to the array. Slices are handed out
+    as zero-copy memoryviews. With utils.diskcache enabled, each grown table
+    is saved, and later runs memory-map it instead of sieving again.
+
+    >>> table = PrimeTable(30)
+    >>> table.limit
+    30
+    >>> list(table.between(10, 20))
+    [11, 13, 17, 19]
+    >>> 29 in table, 33 in table
+    (True, False)
+    """
+
+    def __init__(self, limit=2):
+        self.limit = 1
+        self._primes = array.array('I')
+        self.extend(limit)
+
+    def __len__(self):
+        return len(self._primes)
+
+    def __contains__(self, n):
+        self.extend(n)
+        i = bisect.bisect_left(self._primes, n)
+        return i < len(self._primes) and self._primes[i] == n
+
+    def extend(self, n):
+        """ Ensures the table holds every prime <= n. """
+        if n <= self.limit:
+            return
+        new_limit = max(int(n), 2*self.limit)
+        typecode = _prime_typecode(new_limit)
+        cached = None
+        if utils.diskcache.enabled():
+            cached = utils.diskcache.load('primes', new_limit, typecode)
+        if cached is not None:
+            self._primes = cached
+            self.limit = new_limit
+            return
+        new_primes = array.array(typecode,
+                                 _segmented_primes(self.limit+1, new_limit))
+        if (not isinstance(self._primes, array.array) or
+                typecode != self._primes.typecode):
+            # Widening, or the primes so far are a read-only cached table
+            self._primes = array.array(typecode, self._primes)
+        try:
+            self._primes.extend(new_primes)
+        except BufferError:
+            # Someone is still holding a memoryview from between(), so the
+            # array can't be resized in place. Leave them the old buffer.
+            self._primes = array.array(typecode, self._primes)
+            self._primes.extend(new_primes)
+        self.limit = new_limit
+        if utils.diskcache.enabled():
+            utils.diskcache.save('primes', new_limit, self._primes)
+
+    def between(self, a, b):
+        """ Returns a memoryview of the primes in the range [a, b]. """
+        self.extend(b)
+        a_index = bisect.bisect_left(self._primes, a)
+        b_index = bisect.bisect_right(self._primes, b)
+        return memoryview(self._primes)[a_index:b_index]
+
+# Shared prime table, created by _prime_table() on first use so importing
+# this module doesn't sieve anything.
+_PRIME_TABLE = None
+
+def _prime_table():
+    """ Returns the shared PrimeTable, creating it (with the primes up to
+    the 1000th prime) the first time it is needed. """
+    global _PRIME_TABLE
+    if _PRIME_TABLE is None:
+        _PRIME_TABLE = PrimeTable(7919)
+    return _PRIME_TABLE
 
 def primelist(a, b):
-    """ Return all primes in the range [a, b]
+    """ Return all primes in the range [a, b], as a memoryview into the
+    shared prime table.
 
-    >>> primelist(2, 15)
+    >>> list(primelist(2, 15))
     [2, 3, 5, 7, 11, 13]
-    >>> primelist(2, 13)
+    >>> list(primelist(2, 13))
     [2, 3, 5, 7, 11, 13]
-    >>> primelist(5, 13)
+    >>> list(primelist(5, 13))
     [5, 7, 11, 13]
-    >>> primelist(6, 13)
-    [7, 11, 13] """
-    #from math import ceil
-    #from bisect import bisect_left, bisect_right
+    >>> list(primelist(6, 13))
+    [7, 11, 13]
+    """
     a = max(2, int(math.ceil(a)))
     b = int(math.ceil(b))
-    #while _PRIMELIST_CACHE[-1] < b:
-    #    _PRIMELIST_CACHE.extend(next(_PRIMELIST_GEN) for i in range(1000))
-    _extend_primelist_if_needed(b)
-    a_index = bisect.bisect_left(_PRIMELIST_CACHE, a)
-    b_index = bisect.bisect_right(_PRIMELIST_CACHE, b)
-    return _PRIMELIST_CACHE[a_index:b_index]
+    return _prime_table().between(a, b)
+
+# Primes used to weed out most composites before running Miller-Rabin
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53,
+                 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
+# (bound, witnesses): Miller-Rabin with these witnesses is deterministic for
+# all n < bound. See: https://oeis.org/A014233 and Sorenson & Webster (2015)
+_MR_WITNESSES = (
+    (2047, (2,)),
+    (1373653, (2, 3)),
+    (25326001, (2, 3, 5)),
+    (3215031751, (2, 3, 5, 7)),
+    (2152302898747, (2, 3, 5, 7, 11)),
+    (3474749660383, (2, 3, 5, 7, 11, 13)),
+    (341550071728321, (2, 3, 5, 7, 11, 13, 17)),
+    (3825123056546413051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (318665857834031151167461, _SMALL_PRIMES[:12]),
+    (3317044064679887385961981, _SMALL_PRIMES[:13]),
+)
+
+def miller_rabin(n):
+    """ Miller-Rabin primality test.
+
+    Deterministic for n < 3317044064679887385961981 (~3.3*10^24), using the
+    smallest known sufficient witness set for the size of n. Above that, n is
+    tested against the first 25 primes as witnesses, so a composite passing
+    is possible in principle but none is known.
+
+    >>> miller_rabin(2), miller_rabin(561), miller_rabin(1000000007)
+    (True, False, True)
+    >>> miller_rabin(3825123056546413051) # strong pseudoprime to bases 2..23
+    False
+    """
+    if n < 2:
+        return False
+    for p in _SMALL_PRIMES[:4]:
+        if n % p == 0:
+            return n == p
+    d, s = n-1, 0
+    while not d & 1:
+        d >>= 1
+        s += 1
+    witnesses = _SMALL_PRIMES
+    for bound, ws in _MR_WITNESSES:
+        if n < bound:
+            witnesses = ws
+            break
+    for a in witnesses:
+        if a % n == 0:
+            continue
+        x = pow(a, d, n)
+        if x == 1 or x == n-1:
+            continue
+        for _ in range(s-1):
+            x = x*x % n
+            if x == n-1:
+                break
+        else:
+            return False
+    return True
 
 def isprime(n):
-    """ Tests if a number is prime using sieving.
+    """ Tests if a number is prime.
 
-    Not appropriate for very large n, because will generate all primes
-    less than n (at least). """
-    _extend_primelist_if_needed(n)
-    i = bisect.bisect_left(_PRIMELIST_CACHE, n)
-    return _PRIMELIST_CACHE[i] == n
+    Numbers within the prime table's current limit are looked up directly.
+    Larger numbers get trial division by a few small primes, then a
+    deterministic Miller-Rabin test, so the table is never grown just to
+    answer an isprime() query.
+
+    >>> isprime(7919), isprime(7917), isprime(10**8+7), isprime(10**18+9)
+    (True, False, True, True)
+    """
+    table = _prime_table()
+    if n <= table.limit:
+        return n in table
+    for p in _SMALL_PRIMES:
+        if n % p == 0:
+            return False
+    return miller_rabin(n)
+
+# Largest number of results kept by each memoized function in this module.
+# The memoized functions cache tuples, and the public wrappers build a fresh
+# dict or list from them, so callers can never modify a cached result.
+_MEMO_MAXSIZE = 1 << 16
 
 def trial_division(n):
     """ Returns the integer factorization of n:
@@ -140,8 +319,13 @@ def trial_division(n):
 
     And 10054323 = 31 * 36037 * 3^2:
     >>> trial_division(10054323)
-    {3: 2, 36037: 1, 31: 1}
+    {3: 2, 31: 1, 36037: 1}
     """
+    return dict(_trial_division(n))
+
+@utils.memoize(maxsize=_MEMO_MAXSIZE)
+def _trial_division(n):
+    """ trial_division(n) as a tuple of (p, e) pairs. """
     from collections import defaultdict
     prime_factors = defaultdict(int)
     for p in primelist(2, int(n**0.5)+1):
@@ -151,10 +335,161 @@ def trial_division(n):
             n //= p
     if n > 1:
         prime_factors[n] += 1
-    return dict(prime_factors)
+    return tuple(prime_factors.items())
+
 
+def pollard_brent(n):
+    """ Returns a non-trivial factor of the composite number n, using Brent's
+    variant of Pollard's rho algorithm.
+    See: R. P. Brent, "An improved Monte Carlo factorization algorithm" (1980)
 
-def factorize(n):
+    The polynomials x^2 + c are tried for c = 1, 2, ... until one of them
+    splits n, so the result is deterministic.
+
+    >>> pollard_brent(8051) in (83, 97)
+    True
+    >>> pollard_brent(10403) in (101, 103)
+    True
+    """
+    if n % 2 == 0:
+        return 2
+    m = 128 # Number of steps between gcds
+    for c in itertools.count(1):
+        y, r, q, g = 2, 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y*y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r-k)):
+                    y = (y*y + c) % n
+                    q = q * abs(x-y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            # The batched gcd overshot; step back through the last batch
+            g = 1
+            while g == 1:
+                ys = (ys*ys + c) % n
+                g = math.gcd(abs(x-ys), n)
+        if g != n:
+            return g
+
+# Trial division bound used by rho_factorization before falling back to
+# Miller-Rabin and Pollard-Brent for the remaining cofactor
+_RHO_TRIAL_BOUND = 1000
+
+def rho_factorization(n):
+    """ Returns the integer factorization of n as a dict, like
+    trial_division, but only trial divides by primes below _RHO_TRIAL_BOUND.
+    Whatever cofactor remains is split with pollard_brent until every piece
+    passes isprime.
+
+    >>> rho_factorization(10054323)
+    {3: 2, 31: 1, 36037: 1}
+    >>> rho_factorization(1000000016000000063) # (10^9+7) * (10^9+9)
+    {1000000007: 1, 1000000009: 1}
+    """
+    return dict(_rho_factorization(n))
+
+@utils.memoize(maxsize=_MEMO_MAXSIZE)
+def _rho_factorization(n):
+    """ rho_factorization(n) as a tuple of (p, e) pairs, sorted by p. """
+    prime_factors = collections.defaultdict(int)
+    for p in primelist(2, _RHO_TRIAL_BOUND):
+        if p*p > n: break
+        while n % p == 0:
+            prime_factors[p] += 1
+            n //= p
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if isprime(m):
+            prime_factors[m] += 1
+        else:
+            d = pollard_brent(m)
+            stack.extend((d, m//d))
+    return tuple(sorted(prime_factors.items()))
+
+class FactorTable(object):
+    """ A smallest-prime-factor table for every integer up to limit, for
+    factorizing many numbers below limit in O(log n) each.
+
+    The table stores 0 for primes (and for 0 and 1) and otherwise the smallest
+    prime factor. Since that factor is at most sqrt(limit), the entries are
+    2-byte unsigned shorts for any limit below 2**32. With utils.diskcache
+    enabled, the table is memory-mapped from disk if a previous run built it.
+
+    While a table is active (used as a context manager), factorize() answers
+    from it for every n within its limit:
+    >>> with FactorTable(1000) as table:
+    ...     factorize(360)
+    {2: 3, 3: 2, 5: 1}
+    >>> table.smallest_prime_factor(91), table.smallest_prime_factor(97)
+    (7, 97)
+    """
+
+    def __init__(self, limit):
+        self.limit = int(limit)
+        root = math.isqrt(self.limit)
+        typecode = 'H' if root < 1 << 16 else 'I'
+        def build():
+            spf = array.array(typecode, [0]) * (self.limit+1)
+            # Sieve with the largest primes first, so the smallest prime
+            # dividing n is the last one written to spf[n].
+            for p in reversed(_small_primes(root)):
+                count = (self.limit - p*p) // p + 1
+                spf[p*p::p] = array.array(typecode, [p]) * count
+            return spf
+        self._spf = utils.diskcache.cached('spf', self.limit, typecode, build)
+
+    def __len__(self):
+        return len(self._spf)
+
+    def __enter__(self):
+        _ACTIVE_FACTOR_TABLES.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _ACTIVE_FACTOR_TABLES.remove(self)
+
+    def smallest_prime_factor(self, n):
+        return self._spf[n] or n
+
+    def factorize(self, n):
+        """ Returns the factorization of n <= limit as a dict, in the same
+        form as trial_division. """
+        spf = self._spf
+        prime_factors = {}
+        while n > 1:
+            p = spf[n] or n
+            e = 0
+            while n % p == 0:
+                n //= p
+                e += 1
+            prime_factors[p] = e
+        return prime_factors
+
+# FactorTables entered as context managers; factorize() uses the innermost
+_ACTIVE_FACTOR_TABLES = []
+
+def table_factorization(n):
+    """ Factorizes n with the innermost active FactorTable. """
+    for table in reversed(_ACTIVE_FACTOR_TABLES):
+        if n <= table.limit:
+            return table.factorize(n)
+    raise ValueError('No active FactorTable covers %s' % n)
+
+_FACTORIZE_METHODS = {
+    'trial': trial_division,
+    'rho': rho_factorization,
+    'table': table_factorization,
+}
+
+def factorize(n, method='auto'):
     """ Returns the integer factorization of n:
         n = p_1^e_1 * p_2^e_2 * p_m^e_m
     as a dict the keys are the p_i and the values are the e_i.
@@ -165,14 +500,25 @@ def factorize(n):
 
     And 10054323 = 31 * 36037 * 3^2:
     >>> factorize(10054323)
-    {3: 2, 36037: 1, 31: 1}
-
-    As of now it simply uses trial_division. Later refinements might be to
-    use other algorithms.
+    {3: 2, 31: 1, 36037: 1}
+
+    The algorithm is chosen by method:
+        'trial': trial_division, dividing by every prime up to sqrt(n).
+        'rho':   rho_factorization, which trial divides by small primes only,
+                 then splits the cofactor with Miller-Rabin and Pollard-Brent.
+        'table': table_factorization, looking n up in the active FactorTable.
+        'auto':  'table' if an active FactorTable covers n, otherwise 'rho'.
     """
-    return trial_division(n)
+    if method == 'auto':
+        method = 'rho'
+        for table in _ACTIVE_FACTOR_TABLES:
+            if n <= table.limit:
+                method = 'table'
+                break
+    if method not in _FACTORIZE_METHODS:
+        raise ValueError('Unknown factorization method %r' % method)
+    return _FACTORIZE_METHODS[method](n)
 
-@utils.memoize
 def divisors(n):
     """ Returns a list of divisors of n.
     See: http://stackoverflow.com/a/1010463
@@ -192,6 +538,11 @@ def divisors(n):
     >>> divisors(1)
     [1]
     """
+    return list(_divisors(n))
+
+@utils.memoize(maxsize=_MEMO_MAXSIZE)
+def _divisors(n):
+    """ divisors(n) as a tuple. """
     divs = [1]
     f_dict = factorize(n)
     for factor, count in f_dict.items():
@@ -199,7 +550,7 @@ def divisors(n):
         for _ in range(count):
             newdivs = list(map(lambda d: d*factor, newdivs))
             divs += newdivs
-    return sorted(divs)
+    return tuple(sorted(divs))
 
 def num_of_divisors(n):
     """ Gives number of divisors of n. Equivalent to Mathematica's
@@ -219,6 +570,110 @@ def sum_of_divisors(n):
         denom *= (p-1)
     return num//denom
 
+def _prime_power_splits(N):
+    """ Yields (n, p, e, m) for 2 <= n <= N, where p is the smallest prime
+    factor of n, p^e exactly divides n and m = n / p^e. Each m is smaller
+    than n, so tables indexed by n can be filled in this order. """
+    spf = FactorTable(N)._spf
+    for n in range(2, N+1):
+        p = spf[n] or n
+        m, e = n // p, 1
+        while m % p == 0:
+            m //= p
+            e += 1
+        yield n, p, e, m
+
+def _range_buffer(N, typecode):
+    """ A zeroed table with indices 0..N. A typecode of None gives a list,
+    for values which may not fit in a fixed-width array. """
+    if typecode is None:
+        return [0] * (N+1)
+    return array.array(typecode, [0]) * (N+1)
+
+def multiplicative_range(N, f, typecode='q'):
+    """ Returns a table of g(n) for 0 <= n <= N, where g is the
+    multiplicative function with g(p^e) = f(p, e) on prime powers. The
+    value at index 0 is 0.
+
+    Uses a smallest-prime-factor table, so each n costs O(log n) however
+    large N is. The table is an array of the given typecode (or a list if
+    typecode is None).
+
+    Number of divisors of n^2:
+    >>> list(multiplicative_range(10, lambda p, e: 2*e + 1))
+    [0, 1, 3, 3, 5, 3, 9, 3, 7, 5, 9]
+    """
+    values = _range_buffer(N, typecode)
+    if N >= 1:
+        values[1] = 1
+    for n, p, e, m in _prime_power_splits(N):
+        values[n] = f(p, e) * values[m]
+    return values
+
+def divisor_count_range(N):
+    """ Returns a table of the number of divisors of n, for 0 <= n <= N.
+
+    >>> list(divisor_count_range(12))
+    [0, 1, 2, 2, 3, 2, 4, 2, 4, 3, 4, 2, 6]
+    """
+    return multiplicative_range(N, lambda p, e: e + 1, 'I')
+
+def divisor_sum_range(N, k=1):
+    """ Returns a table of sigma_k(n), the sum of the k-th powers of the
+    divisors of n, for 0 <= n <= N.
+
+    >>> list(divisor_sum_range(12))
+    [0, 1, 3, 4, 7, 6, 12, 8, 15, 13, 18, 12, 28]
+    >>> list(divisor_sum_range(6, 2))
+    [0, 1, 5, 10, 21, 26, 50]
+    """
+    if k == 0:
+        return divisor_count_range(N)
+    # sigma_k(n) < n^k * (1 + ln n) bounds every value, so use a 64-bit array
+    # when it fits and a list when it might not.
+    typecode = 'q'
+    if N > 1 and N**k * (1 + math.log(N)) >= 2**63:
+        typecode = None
+    def sigma_k(p, e):
+        pk = p**k
+        return (pk**(e+1) - 1) // (pk - 1)
+    return multiplicative_range(N, sigma_k, typecode)
+
+def totient_range(N):
+    """ Returns a read-only memoryview of Euler's totient phi(n), for
+    0 <= n <= N. It is read-only whether the table was just built or
+    memory-mapped from utils.diskcache.
+
+    >>> list(totient_range(12))
+    [0, 1, 1, 2, 2, 4, 2, 6, 4, 6, 4, 10, 4]
+    """
+    typecode = _prime_typecode(N)
+    table = utils.diskcache.cached(
+        'totient', N, typecode,
+        lambda: multiplicative_range(N, lambda p, e: p**(e-1) * (p-1),
+                                     typecode))
+    return memoryview(table).toreadonly()
+
+def mobius_range(N):
+    """ Returns a table of the Mobius function mu(n), for 0 <= n <= N.
+
+    >>> list(mobius_range(12))
+    [0, 1, -1, -1, 0, -1, 1, -1, 0, 0, 1, -1, 0]
+    """
+    return multiplicative_range(N, lambda p, e: -1 if e == 1 else 0, 'b')
+
+def omega_range(N):
+    """ Returns a table of omega(n), the number of distinct prime factors of
+    n, for 0 <= n <= N.
+
+    >>> list(omega_range(12))
+    [0, 0, 1, 1, 1, 1, 2, 1, 1, 1, 2, 1, 2]
+    """
+    values = _range_buffer(N, 'B')
+    for n, p, e, m in _prime_power_splits(N):
+        values[n] = values[m] + 1
+    return values
+
 def partitions(n):
     """ Yields partitions of n in ascending order.
     See: http://homepages.ed.ac.uk/jkellehe/partitions.php
@@ -330,7 +785,7 @@ class TrialDivPrimeTester(object):
         1. If N <= 10**tuning, does a direct check against the list of primes
         2. If 10**tuning < N < 10**(2*tuning), performs trial division using
            the list of primes.
-        3. If N =< 10**(2*tuning), fails with an error.
+        3. If N >= 10**(2*tuning), falls back to a Miller-Rabin test.
 
     Objects of this type are callable, so the intended usage is:
     >>> prime_tester = TrialDivPrimeTester(4)
@@ -340,8 +795,9 @@ class TrialDivPrimeTester(object):
     True
     >>> prime_tester(99999999) # Largest testable value
     False
-    >>> prime_tester(100000001) # Will fail
-    ValueError: We cannot test number greater than 100000000"""
+    >>> prime_tester(100000007) # Tested using Miller-Rabin
+    True
+    """
 
     def __init__(self, tuning):
         """ Create a trial division prime tester which creates a list
@@ -355,8 +811,7 @@ class TrialDivPrimeTester(object):
         if n < self.small_cutoff:
             return n in self._small_primes
         elif n >= self.big_cutoff:
-            raise ValueError('We cannot test number greater than %s'
-                             % self.big_cutoff)
+            return miller_rabin(n)
         else:
             return self._is_prime_by_trial_division_of_small_primes(n)
 
@@ -0,0 +1,149 @@
+""" Profiling for problem solutions, shared by solution_printer and the
+benchmark harness.
+
+Three profilers are available:
+    cprofile     deterministic function-level profile. Writes PREFIX.pstats
+                 (readable with pstats, snakeviz, gprof2dot, ...).
+    tracemalloc  where memory is allocated. Writes PREFIX.tracemalloc, a
+                 tracemalloc.Snapshot dump.
+    sampling     samples the running stack every few milliseconds. Writes
+                 PREFIX.folded, collapsed stacks for flamegraph.pl or
+                 speedscope.
+Each also prints a table of the hottest functions (or lines).
+"""
+from __future__ import print_function
+import collections
+import sys
+import threading
+
+PROFILERS = ('cprofile', 'tracemalloc', 'sampling')
+
+
+def _profile_cprofile(func, args, kwargs, prefix, stream, top):
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    profiler.dump_stats(prefix + '.pstats')
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats('cumulative').print_stats(top)
+    return result
+
+
+def _profile_tracemalloc(func, args, kwargs, prefix, stream, top):
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    snapshot.dump(prefix + '.tracemalloc')
+    print('Peak traced memory: %d bytes, still allocated: %d bytes'
+          % (peak, current), file=stream)
+    for stat in snapshot.statistics('lineno')[:top]:
+        print(stat, file=stream)
+    return result
+
+
+class SamplingProfiler(object):
+    """ Statistical profiler: a background thread records the stack of the
+    profiled thread every interval seconds. Cheap enough to leave the
+    solution's running time roughly unchanged. """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+
+    def _sample(self, thread_id):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            # Stop at _profiled_call, so stacks are rooted at the profiled
+            # function. Samples taken outside it (as the call starts or
+            # finishes) never reach it and are dropped.
+            while frame is not None and frame.f_code is not _PROFILED_CODE:
+                code = frame.f_code
+                stack.append('%s (%s:%d)' % (code.co_name, code.co_filename,
+                                             code.co_firstlineno))
+                frame = frame.f_back
+            if frame is not None and stack:
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+
+    def runcall(self, func, *args, **kwargs):
+        sampler = threading.Thread(target=self._sample,
+                                   args=(threading.current_thread().ident,))
+        sampler.daemon = True
+        sampler.start()
+        try:
+            return _profiled_call(func, args, kwargs)
+        finally:
+            self._stop.set()
+            sampler.join()
+
+    def write_folded(self, path):
+        """ Writes collapsed stacks, one 'f1;f2;f3 count' line per stack. """
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write('%s %d\n' % (';'.join(stack), count))
+
+    def print_hot(self, stream=None, top=20):
+        """ Prints the functions most often at the top of the stack (self)
+        and anywhere on it (total). """
+        own, total = collections.Counter(), collections.Counter()
+        samples = sum(self.stacks.values()) or 1
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                total[function] += count
+        print('%d samples every %gs' % (samples, self.interval), file=stream)
+        print('%7s %7s  %s' % ('self%', 'total%', 'function'), file=stream)
+        for function, count in own.most_common(top):
+            print('%7.1f %7.1f  %s' % (100.0 * count / samples,
+                                       100.0 * total[function] / samples,
+                                       function), file=stream)
+
+def _profiled_call(func, args, kwargs):
+    return func(*args, **kwargs)
+
+_PROFILED_CODE = _profiled_call.__code__
+
+
+def _profile_sampling(func, args, kwargs, prefix, stream, top):
+    profiler = SamplingProfiler()
+    result = profiler.runcall(func, *args, **kwargs)
+    profiler.write_folded(prefix + '.folded')
+    profiler.print_hot(stream, top)
+    return result
+
+_PROFILERS = {
+    'cprofile': _profile_cprofile,
+    'tracemalloc': _profile_tracemalloc,
+    'sampling': _profile_sampling,
+}
+
+def profile_call(func, args=(), kwargs={}, mode='cprofile', prefix='profile',
+                 stream=None, top=20):
+    """ Calls func(*args, **kwargs) under the profiler named by mode and
+    returns its result. Writes the profile to files starting with prefix and
+    prints the top hot spots to stream (default stdout). """
+    if mode not in _PROFILERS:
+        raise ValueError('Unknown profiler %r, expected one of %s'
+                         % (mode, ', '.join(PROFILERS)))
+    return _PROFILERS[mode](func, args, kwargs, prefix, stream or sys.stdout,
+                            top)
+
+
+def mode_from_argv(argv=None):
+    """ Returns the profiler requested with --profile=MODE (or
+    '--profile MODE') on the command line, or None. """
+    argv = sys.argv[1:] if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg.startswith('--profile='):
+            return arg.split('=', 1)[1]
+        if arg == '--profile' and i+1 < len(argv):
+            return argv[i+1]
+    return None
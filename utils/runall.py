@@ -0,0 +1,158 @@
+""" Runs every problem solution in parallel, each in its own process with a
+hard time limit, and prints a summary table.
+
+From the repository root:
+    python runall.py
+    python runall.py p50 p87 --workers 4 --timeout 30
+or, with the repository importable as the euler package:
+    python -m euler.runall
+"""
+from __future__ import print_function
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import utils.bench
+
+REPO_DIR = utils.bench.REPO_DIR
+
+
+def solve(name, repo_dir=None):
+    """ Runs problem name (from repo_dir, default: the repository) once in
+    this process and returns a result dict. Output printed by the solution
+    is swallowed. """
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        ans_func, args, kwargs = utils.bench.find_answer(name, repo_dir)
+        start = time.perf_counter()
+        answer = ans_func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    finally:
+        sys.stdout = stdout
+    return {'problem': name, 'status': 'ok', 'answer': repr(answer),
+            'seconds': seconds}
+
+
+class _Job(object):
+    """ A problem being solved in a child interpreter. """
+
+    def __init__(self, name, repo_dir=None):
+        self.name = name
+        # Files rather than pipes, so a chatty child can never block on a
+        # full pipe while we wait on it.
+        self.out = tempfile.TemporaryFile(mode='w+')
+        self.err = tempfile.TemporaryFile(mode='w+')
+        cmd = [sys.executable, '-m', 'utils.runall', '--child', name]
+        if repo_dir:
+            cmd += ['--repo-dir', repo_dir]
+        self.proc = subprocess.Popen(
+            cmd, cwd=REPO_DIR, stdout=self.out, stderr=self.err,
+            universal_newlines=True)
+        self.start = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.wait()
+
+    def result(self):
+        self.out.seek(0)
+        self.err.seek(0)
+        lines = self.out.read().strip().splitlines()
+        errors = self.err.read().strip().splitlines()
+        self.out.close()
+        self.err.close()
+        if self.proc.returncode == 0 and lines:
+            return json.loads(lines[-1])
+        message = errors[-1] if errors else 'exit %s' % self.proc.returncode
+        return {'problem': self.name, 'status': 'error', 'error': message}
+
+
+def run_all(names, workers=None, timeout=utils.bench.TIME_BUDGET,
+            repo_dir=None):
+    """ Solves each of the problems names (modules in repo_dir, default: the
+    repository), running up to workers (default: the number of CPUs) at
+    once. A problem still running after timeout seconds is killed. Returns a list of result dicts, in the order of
+    names, each with a 'status' of 'ok', 'error' or 'timeout'. """
+    workers = workers or os.cpu_count() or 1
+    pending = list(names)
+    running = []
+    results = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            running.append(_Job(pending.pop(0), repo_dir))
+        for job in list(running):
+            if job.proc.poll() is not None:
+                results[job.name] = job.result()
+                results[job.name]['wall_seconds'] = job.elapsed()
+            elif job.elapsed() > timeout:
+                job.kill()
+                job.result()
+                results[job.name] = {'problem': job.name,
+                                     'status': 'timeout',
+                                     'wall_seconds': job.elapsed()}
+            else:
+                continue
+            running.remove(job)
+        time.sleep(0.01)
+    return [results[name] for name in names]
+
+
+def print_summary(results):
+    header = '%-8s %-8s %10s  %s' % ('problem', 'status', 'seconds', 'answer')
+    print(header)
+    print('-'*len(header))
+    for r in results:
+        if r['status'] == 'ok':
+            detail, seconds = r['answer'], '%9.3fs' % r['seconds']
+        else:
+            detail, seconds = r.get('error', ''), '%9.3fs' % r['wall_seconds']
+        print('%-8s %-8s %10s  %s' % (r['problem'], r['status'], seconds,
+                                      detail))
+    ok = sum(1 for r in results if r['status'] == 'ok')
+    print('-'*len(header))
+    print('%d of %d problems solved' % (ok, len(results)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run every Project Euler solution in parallel.')
+    parser.add_argument('problems', nargs='*',
+                        help='problem modules, e.g. p50 (default: all)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes to run at once (default: CPU count)')
+    parser.add_argument('--timeout', type=float,
+                        default=utils.bench.TIME_BUDGET,
+                        help='seconds before a problem is killed')
+    parser.add_argument('--json', metavar='PATH',
+                        help='write results as JSON to PATH')
+    parser.add_argument('--repo-dir', metavar='DIR',
+                        help='directory of the problem modules '
+                             '(default: the repository)')
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(solve(args.problems[0], args.repo_dir)))
+        return 0
+
+    results = run_all(args.problems or utils.bench.discover(args.repo_dir),
+                      args.workers, args.timeout, args.repo_dir)
+    print_summary(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'timeout': args.timeout, 'results': results}, f,
+                      indent=2)
+    return 0 if all(r['status'] == 'ok' for r in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())